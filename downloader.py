@@ -18,7 +18,7 @@ from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 import asyncio
 
-from PyQt6.QtCore import QRunnable, QObject, pyqtSignal, QThread
+from PyQt6.QtCore import QRunnable, QObject, pyqtSignal
 import yt_dlp
 
 from validators import VideoURL
@@ -26,6 +26,12 @@ from yt_dlp_utils import YtDlpConfigManager, YtDlpFormatAnalyzer, YtDlpDiagnosti
 
 logger = logging.getLogger('VideoDownloader')
 
+# Регулярные выражения горячего пути загрузки компилируются один раз при импорте
+_RESOLUTION_NUMBER_RE = re.compile(r'(\d+)p')
+_FORMAT_ID_SUFFIX_RE = re.compile(r'\.f\d+[-+]?\d*')
+_MERGED_FORMAT_ID_RE = re.compile(r'\+\d+')
+_MEDIA_EXTENSION_RE = re.compile(r'\.webm$|\.mkv$|\.m4a$')
+
 
 def run_subprocess_hidden(cmd, **kwargs):
     """
@@ -55,6 +61,31 @@ def run_subprocess_hidden(cmd, **kwargs):
     return subprocess.run(cmd, **final_kwargs)
 
 
+def start_subprocess_hidden(cmd, **kwargs) -> subprocess.Popen:
+    """
+    Запускает процесс без ожидания завершения со скрытием консоли в Windows.
+
+    Args:
+        cmd: Команда для выполнения
+        **kwargs: Дополнительные аргументы для subprocess.Popen
+
+    Returns:
+        Объект subprocess.Popen
+    """
+    final_kwargs = {
+        'stdout': subprocess.PIPE,
+        'stderr': subprocess.PIPE,
+        'text': True,
+        **kwargs
+    }
+
+    # Скрываем консоль в Windows
+    if platform.system() == 'Windows':
+        final_kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
+
+    return subprocess.Popen(cmd, **final_kwargs)
+
+
 class VideoDownloaderError(Exception):
     """Базовое исключение для приложения"""
     pass
@@ -131,6 +162,9 @@ class VideoInfoCache:
         self.cache_size_bytes = 0
         self.last_cleanup = time.time()
         self._lock = threading.RLock()  # Блокировка для потокобезопасности
+        # Журнал добавлений: новые записи дописываются построчно, без полной перезаписи кэша
+        self.journal_filename = 'video_cache.jsonl'
+        self._journal = None
         
     def get(self, url: str) -> Optional[Dict[str, Any]]:
         """
@@ -151,8 +185,8 @@ class VideoInfoCache:
                 # Перемещаем элемент в конец OrderedDict, чтобы сохранить LRU-порядок
                 value = self.cache.pop(key)
                 self.cache[key] = value
-            logger.info(f"Информация о видео получена из кэша: {url}")
-            return value
+                logger.info(f"Информация о видео получена из кэша: {url}")
+                return value
         return None
         
     def set(self, url: str, info: Dict[str, Any]) -> None:
@@ -164,10 +198,55 @@ class VideoInfoCache:
             info: Информация о видео
         """
         key = self._get_key(url)
+        with self._lock:
+            info_size = self._insert(key, info)
+            logger.info(f"Информация о видео добавлена в кэш: {url} (размер: {info_size} байт)")
+
+            # Дописываем запись в журнал вместо полной перезаписи файла кэша
+            try:
+                self.append(key, info)
+            except Exception as e:
+                logger.warning(f"Не удалось записать элемент кэша в журнал: {e}")
 
+    def append(self, key: str, info: Dict[str, Any]) -> None:
+        """
+        Дописывает одну запись кэша в журнал строкой JSON.
+
+        Args:
+            key: Ключ кэша
+            info: Информация о видео
+        """
+        with self._lock:
+            if self._journal is None:
+                self._journal = open(self.journal_filename, 'a', encoding='utf-8')
+            self._journal.write(json.dumps({'key': key, 'info': info}, default=str) + '\n')
+            self._journal.flush()
+
+    def close(self) -> None:
+        """Закрывает журнал кэша; все записи уже находятся на диске."""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def _insert(self, key: str, info: Dict[str, Any]) -> int:
+        """
+        Добавляет запись в память с вытеснением старых элементов.
+
+        Args:
+            key: Ключ кэша
+            info: Информация о видео
+
+        Returns:
+            Оценка размера добавленной записи в байтах
+        """
         # Оцениваем размер данных
         info_size = self._estimate_size(info)
 
+        # Заменяемая запись не должна учитываться в размере кэша дважды
+        if key in self.cache:
+            self.cache_size_bytes -= self._estimate_size(self.cache.pop(key))
+
         # Проверяем ограничения памяти
         while (len(self.cache) >= self.max_size or
                self.cache_size_bytes + info_size > self.max_memory_bytes):
@@ -179,13 +258,7 @@ class VideoInfoCache:
 
         self.cache[key] = info
         self.cache_size_bytes += info_size
-        logger.info(f"Информация о видео добавлена в кэш: {url} (размер: {info_size} байт)")
-
-        # Автоматически сохраняем кэш в файл после добавления
-        try:
-            self.save_to_file()
-        except Exception as e:
-            logger.warning(f"Не удалось автоматически сохранить кэш: {e}")
+        return info_size
 
     def clear(self) -> None:
         """Очищает кэш."""
@@ -242,7 +315,10 @@ class VideoInfoCache:
         
     def save_to_file(self, filename: str = 'video_cache.json') -> bool:
         """
-        Сохраняет кэш в файл.
+        Сохраняет кэш в файл целиком и очищает журнал добавлений.
+
+        Запись идет во временный файл с последующей атомарной заменой,
+        поэтому прерванное сохранение не повреждает существующий кэш.
         
         Args:
             filename: Имя файла для сохранения кэша
@@ -251,10 +327,18 @@ class VideoInfoCache:
             True в случае успешного сохранения, иначе False
         """
         try:
-            # Преобразуем OrderedDict в обычный словарь для сериализации
-            cache_data = {k: v for k, v in self.cache.items()}
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f)
+            with self._lock:
+                # Преобразуем OrderedDict в обычный словарь для сериализации
+                cache_data = {k: v for k, v in self.cache.items()}
+                tmp_filename = filename + '.tmp'
+                with open(tmp_filename, 'w', encoding='utf-8') as f:
+                    json.dump(cache_data, f)
+                os.replace(tmp_filename, filename)
+
+                # Все записи журнала теперь содержатся в основном файле
+                self.close()
+                if os.path.exists(self.journal_filename):
+                    os.remove(self.journal_filename)
             logger.info(f"Кэш успешно сохранен в файл: {filename}")
             return True
         except Exception as e:
@@ -272,25 +356,169 @@ class VideoInfoCache:
             True в случае успешной загрузки, иначе False
         """
         try:
+            loaded = False
             if os.path.exists(filename):
                 with open(filename, 'r', encoding='utf-8') as f:
                     cache_data = json.load(f)
                     # Преобразуем обычный словарь в OrderedDict
                     self.cache = OrderedDict(cache_data)
+                    self.cache_size_bytes = sum(self._estimate_size(v) for v in self.cache.values())
                 logger.info(f"Кэш успешно загружен из файла: {filename}")
-                return True
+                loaded = True
             else:
                 logger.info(f"Файл кэша не найден: {filename}")
-                return False
+
+            # Применяем записи, добавленные в журнал за прошлые сеансы,
+            # и переносим их в основной файл
+            if self._replay_journal():
+                self.save_to_file(filename)
+                loaded = True
+            return loaded
         except Exception as e:
             logger.error(f"Ошибка при загрузке кэша из файла: {e}")
             return False
 
+    def _replay_journal(self) -> bool:
+        """
+        Применяет к кэшу записи из журнала добавлений.
+
+        Returns:
+            True, если из журнала была применена хотя бы одна запись
+        """
+        if not os.path.exists(self.journal_filename):
+            return False
+
+        replayed = 0
+        with open(self.journal_filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Последняя строка могла быть записана не полностью
+                    continue
+                self._insert(entry['key'], entry['info'])
+                replayed += 1
+        logger.info(f"Из журнала кэша применено записей: {replayed}")
+        return replayed > 0
+
 
 # Создаем глобальный экземпляр кэша с ограничениями памяти
 video_info_cache = VideoInfoCache(max_size=50, max_memory_mb=100)
 
 
+class ResolutionCache:
+    """Класс для кэширования списков доступных разрешений с ограниченным временем жизни."""
+
+    def __init__(self, max_size: int = 100, ttl: int = 300):
+        """
+        Инициализирует кэш разрешений.
+
+        Args:
+            max_size: Максимальное количество URL в кэше
+            ttl: Время жизни записи в секундах
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        # URL -> (список разрешений, время добавления)
+        self.cache: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, url: str) -> Optional[List[str]]:
+        """
+        Получает список разрешений из кэша.
+
+        Args:
+            url: URL видео
+
+        Returns:
+            Список разрешений или None, если запись отсутствует или устарела
+        """
+        with self._lock:
+            entry = self.cache.get(url)
+            if entry is None:
+                return None
+            resolutions, timestamp = entry
+            if time.time() - timestamp >= self.ttl:
+                del self.cache[url]
+                return None
+            self.cache.move_to_end(url)
+            return list(resolutions)
+
+    def set(self, url: str, resolutions: List[str]) -> None:
+        """
+        Добавляет список разрешений в кэш.
+
+        Args:
+            url: URL видео
+            resolutions: Список доступных разрешений
+        """
+        with self._lock:
+            self.cache[url] = (list(resolutions), time.time())
+            self.cache.move_to_end(url)
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очищает кэш."""
+        with self._lock:
+            self.cache.clear()
+        logger.info("Кэш разрешений очищен")
+
+    def save_to_file(self, filename: str = 'resolution_cache.json') -> bool:
+        """
+        Сохраняет кэш в файл.
+
+        Args:
+            filename: Имя файла для сохранения кэша
+
+        Returns:
+            True в случае успешного сохранения, иначе False
+        """
+        try:
+            with self._lock:
+                cache_data = {url: [resolutions, timestamp]
+                              for url, (resolutions, timestamp) in self.cache.items()}
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(cache_data, f)
+            logger.info(f"Кэш разрешений сохранен в файл: {filename}")
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении кэша разрешений в файл: {e}")
+            return False
+
+    def load_from_file(self, filename: str = 'resolution_cache.json') -> bool:
+        """
+        Загружает кэш из файла, пропуская устаревшие записи.
+
+        Args:
+            filename: Имя файла с кэшем
+
+        Returns:
+            True в случае успешной загрузки, иначе False
+        """
+        try:
+            if not os.path.exists(filename):
+                return False
+            with open(filename, 'r', encoding='utf-8') as f:
+                cache_data = json.load(f)
+            now = time.time()
+            with self._lock:
+                self.cache = OrderedDict(
+                    (url, (resolutions, timestamp))
+                    for url, (resolutions, timestamp) in cache_data.items()
+                    if now - timestamp < self.ttl
+                )
+            logger.info(f"Кэш разрешений загружен из файла: {filename}")
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке кэша разрешений из файла: {e}")
+            return False
+
+
+# Глобальный кэш разрешений
+resolution_cache = ResolutionCache(max_size=100, ttl=300)
+
+
 class AsyncVideoInfoFetcher:
     """Класс для асинхронного получения информации о видео."""
     
@@ -343,7 +571,7 @@ class AsyncVideoInfoFetcher:
         """
         try:
             # Определяем сервис для оптимизации настроек
-            service = VideoURL.get_service_name(url) if hasattr(VideoURL, 'get_service_name') else ''
+            service = VideoURL.get_service_name(url)
 
             # Используем базовые настройки с оптимизацией для получения информации
             ydl_opts = self._create_base_ydl_opts(service)
@@ -600,7 +828,7 @@ class AsyncVideoInfoFetcher:
         """
         try:
             # Определяем сервис для оптимизации настроек
-            service = VideoURL.get_service_name(url) if hasattr(VideoURL, 'get_service_name') else ''
+            service = VideoURL.get_service_name(url)
 
             # Используем базовые настройки но с манифестами
             ydl_opts = self._create_base_ydl_opts(service)
@@ -791,122 +1019,125 @@ class AsyncVideoInfoFetcher:
 video_info_fetcher = AsyncVideoInfoFetcher()
 
 
-class ResolutionWorker(QThread):
+class ResolutionRunnable(QRunnable):
     """
-    Поток для получения доступных разрешений видео.
+    QRunnable для получения доступных разрешений видео в общем пуле потоков.
     """
-    resolutions_found = pyqtSignal(list)
-    error_occurred = pyqtSignal(str)
+    # Стандартные высоты кадра, отображаемые в списке разрешений
+    STANDARD_HEIGHTS = frozenset((144, 240, 360, 480, 720, 1080, 1440, 2160))
+
+    class Signals(QObject):
+        """
+        Сигналы для обмена информацией с основным потоком.
+        Первым аргументом передается идентификатор запроса; последний аргумент
+        resolutions_found сообщает, получен ли список от yt-dlp, а не подставлен
+        по умолчанию.
+        """
+        resolutions_found = pyqtSignal(int, list, bool)
+        error_occurred = pyqtSignal(int, str)
 
-    def __init__(self, url: str) -> None:
+    def __init__(self, url: str, request_id: int = 0) -> None:
         """
-        Инициализирует объект ResolutionWorker.
+        Инициализирует задачу получения разрешений.
         
         Args:
             url: URL видео, для которого нужно получить разрешения
+            request_id: Идентификатор запроса для отбрасывания устаревших результатов
         """
         super().__init__()
         self.url: str = url
+        self.request_id: int = request_id
         self.is_running: bool = True
+        self.signals = self.Signals()
+        self._process: Optional[subprocess.Popen] = None
 
     def run(self) -> None:
-        """Выполняет получение разрешений в отдельном потоке."""
+        """Выполняет получение разрешений в потоке пула."""
         try:
             logger.info(f"Получение доступных разрешений для: {self.url}")
 
-            # Проверяем, что поток не был остановлен
+            # Проверяем, что задача не была отменена
             if not self.is_running:
-                logger.info("Поток был остановлен перед началом получения разрешений")
+                logger.info("Задача была отменена перед началом получения разрешений")
                 return
 
             # Используем yt-dlp -F для получения форматов
             resolutions = self._get_resolutions_with_ytdlp()
 
-            # Проверяем, что поток еще активен
+            # Проверяем, что задача еще актуальна
             if not self.is_running:
-                logger.info("Поток был остановлен после получения разрешений")
+                logger.info("Задача была отменена после получения разрешений")
                 return
 
-            self.resolutions_found.emit(resolutions)
+            # При неудачной проверке показываем стандартный список, но помечаем его,
+            # чтобы интерфейс позволил повторить проверку того же URL
+            probed = resolutions is not None
+            if not probed:
+                resolutions = self._get_default_resolutions()
+            self.signals.resolutions_found.emit(self.request_id, resolutions, probed)
         except Exception as e:
-            if self.is_running:  # Отправляем сигнал только если поток не был принудительно остановлен
+            if self.is_running:  # Отправляем сигнал только если задача не была отменена
                 logger.exception(f"Ошибка при получении разрешений: {self.url}")
                 user_friendly_error = "Не удалось получить доступные разрешения. Проверьте URL и подключение к интернету."
-                self.error_occurred.emit(user_friendly_error)
+                self.signals.error_occurred.emit(self.request_id, user_friendly_error)
 
-    def _get_resolutions_with_ytdlp(self) -> List[str]:
+    def _get_resolutions_with_ytdlp(self) -> Optional[List[str]]:
         """
-        Получает доступные разрешения используя yt-dlp -F.
+        Получает доступные разрешения из JSON-описания видео (yt-dlp --dump-json).
+
+        yt-dlp работает в отдельном процессе, поэтому не конкурирует с интерфейсом
+        за GIL, а отмена задачи сразу завершает этот процесс.
 
         Returns:
-            Список доступных разрешений
+            Список доступных разрешений или None, если получить их не удалось
         """
-        import subprocess
-        import re
-
         try:
-            # Запускаем yt-dlp -F для получения форматов с скрытием консоли
-            cmd = ['yt-dlp', '-F', self.url]
-            result = run_subprocess_hidden(cmd, encoding='utf-8')
+            # Запускаем yt-dlp с скрытием консоли
+            cmd = ['yt-dlp', '--dump-json', '--no-playlist', self.url]
+            self._process = start_subprocess_hidden(cmd, encoding='utf-8')
+            if not self.is_running:
+                # Отмена пришла до запуска процесса
+                self._process.kill()
+            stdout, stderr = self._process.communicate(timeout=30)
 
-            if result.returncode != 0:
-                logger.error(f"yt-dlp -F завершился с ошибкой: {result.stderr}")
-                return self._get_default_resolutions()
+            if self._process.returncode != 0:
+                if self.is_running:
+                    logger.error(f"yt-dlp --dump-json завершился с ошибкой: {stderr}")
+                return None
 
-            # Парсим вывод yt-dlp для извлечения разрешений
+            # Собираем стандартные разрешения видеоформатов
+            info = json.loads(stdout)
             resolutions = set()
-            lines = result.stdout.split('\n')
-
-            for line in lines:
-                # Пропускаем заголовки и служебные строки
-                if any(skip in line for skip in [
-                    'Extracting', 'Downloading', '[info]', 'ID      EXT',
-                    '─────', 'Available formats', 'storyboard'
-                ]):
-                    continue
-
-                # Пропускаем аудио форматы
-                if 'audio only' in line:
+            for fmt in info.get('formats') or []:
+                height = fmt.get('height')
+                # Пропускаем аудио форматы и storyboard
+                if not height or fmt.get('vcodec') == 'none':
                     continue
-
-                # Ищем строки с разрешениями (например: "1280x720", "854x480")
-                resolution_match = re.search(r'(\d+)x(\d+)', line)
-                if resolution_match:
-                    width = int(resolution_match.group(1))
-                    height = int(resolution_match.group(2))
-
-                    # Пропускаем слишком маленькие разрешения (storyboard)
-                    if height < 144:
-                        continue
-
-                    # Добавляем только стандартные разрешения
-                    if height in [144, 240, 360, 480, 720, 1080, 1440, 2160]:
-                        resolutions.add(f"{height}p")
-                        logger.debug(f"Найдено разрешение: {width}x{height} ({height}p)")
-
-                # Также ищем упоминания разрешений в формате "720p", "1080p" и т.д.
-                resolution_p_match = re.search(r'(\d+)p(?:\d+)?', line)
-                if resolution_p_match:
-                    height = int(resolution_p_match.group(1))
-                    if height in [144, 240, 360, 480, 720, 1080, 1440, 2160]:
-                        resolutions.add(f"{height}p")
+                if height in self.STANDARD_HEIGHTS:
+                    resolutions.add(height)
 
             # Преобразуем в отсортированный список
-            resolution_list = sorted(list(resolutions), key=lambda x: int(x[:-1]))
+            resolution_list = [f"{height}p" for height in sorted(resolutions)]
 
             if resolution_list:
-                logger.info(f"Найдены разрешения через yt-dlp -F: {resolution_list}")
+                logger.info(f"Найдены разрешения через yt-dlp --dump-json: {resolution_list}")
+                # Кэшируем только реально полученные разрешения, не значения по умолчанию
+                resolution_cache.set(self.url, resolution_list)
                 return resolution_list
             else:
-                logger.warning("Не найдено разрешений в выводе yt-dlp -F")
-                return self._get_default_resolutions()
+                logger.warning("Не найдено разрешений в выводе yt-dlp --dump-json")
+                return None
 
         except subprocess.TimeoutExpired:
-            logger.error("Таймаут при выполнении yt-dlp -F")
-            return self._get_default_resolutions()
+            self._process.kill()
+            self._process.communicate()
+            logger.error("Таймаут при выполнении yt-dlp --dump-json")
+            return None
         except Exception as e:
-            logger.exception(f"Ошибка при выполнении yt-dlp -F: {e}")
-            return self._get_default_resolutions()
+            logger.exception(f"Ошибка при выполнении yt-dlp --dump-json: {e}")
+            return None
+        finally:
+            self._process = None
 
     def _get_default_resolutions(self) -> List[str]:
         """
@@ -917,11 +1148,72 @@ class ResolutionWorker(QThread):
         """
         return ["144p", "240p", "360p", "480p", "720p", "1080p"]
 
-    def terminate(self) -> None:
-        """Переопределяем terminate для безопасной остановки потока."""
-        logger.info(f"Запрос на остановку потока ResolutionWorker для URL: {self.url}")
+    def cancel(self) -> None:
+        """
+        Кооперативно отменяет получение разрешений.
+        
+        Задача не прерывается принудительно: она завершается сама,
+        не отправляя сигналов с результатом.
+        """
+        logger.info(f"Отмена получения разрешений для URL: {self.url}")
         self.is_running = False
-        super().terminate()
+        # Завершаем процесс yt-dlp, чтобы освободить поток пула
+        process = self._process
+        if process is not None and process.poll() is None:
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+
+# Понятные пользователю сообщения для технических ошибок загрузки: (выражение, сообщение).
+# Регистр не учитывается, кроме исходных англоязычных фраз YouTube; правила с
+# несколькими условиями требуют наличия всех слов в любом месте сообщения
+_ERROR_MESSAGE_RULES = tuple((re.compile(pattern, flags), message) for pattern, flags, message in (
+    # HTTP ошибки
+    (r'404', 0, "Ошибка: Видео не найдено (404). Возможно, оно было удалено или является приватным."),
+    (r'403', 0, "Ошибка: Доступ запрещен (403). Видео может быть недоступно в вашем регионе."),
+    (r'429', 0, "Ошибка: Слишком много запросов (429). Попробуйте позже."),
+    (r'500', 0, "Ошибка сервера (500). Попробуйте позже или выберите другое разрешение."),
+    (r'503', 0, "Сервис временно недоступен (503). Попробуйте позже."),
+    # Ошибки авторизации и ограничений
+    (r'Sign in to confirm your age|age-restricted', 0,
+     "Ошибка: Видео имеет возрастные ограничения и требует авторизации."),
+    (r'private video|приватное видео', re.I, "Ошибка: Это приватное видео, доступ к которому ограничен."),
+    (r'members-only|только для участников', re.I, "Ошибка: Видео доступно только для участников канала."),
+    (r'\A(?=.*premium)(?=.*(?:required|необходим))', re.I | re.S,
+     "Ошибка: Для просмотра этого видео требуется премиум-подписка."),
+    # Географические ограничения
+    (r'\A(?=.*geo)(?=.*(?:block|restrict))', re.I | re.S,
+     "Ошибка: Видео заблокировано в вашем регионе. Попробуйте использовать VPN."),
+    (r'not available in your country', re.I, "Ошибка: Видео недоступно в вашей стране."),
+    # Ошибки сети и подключения
+    (r'ssl|подключени|connect|timeout|network', re.I,
+     "Ошибка подключения. Проверьте соединение с интернетом или попробуйте позже."),
+    (r'dns', re.I, "Ошибка DNS. Проверьте настройки сети или попробуйте позже."),
+    # Ошибки авторских прав
+    (r'copyright|авторские права|dmca', re.I, "Ошибка: Видео недоступно из-за нарушения авторских прав."),
+    # Ошибки форматов и кодеков
+    (r'no video formats found|форматы не найдены', re.I,
+     "Ошибка: Не найдены подходящие форматы видео. Попробуйте другое разрешение."),
+    (r'format not available', re.I, "Ошибка: Выбранный формат недоступен. Попробуйте другое разрешение."),
+    (r'\A(?=.*ffmpeg)(?=.*not found)', re.I | re.S,
+     "Ошибка: FFmpeg не найден. Установите FFmpeg для корректной работы."),
+    # Ошибки экстракторов
+    (r'\A(?=.*extractor)(?=.*(?:failed|error))', re.I | re.S,
+     "Ошибка извлечения данных. Возможно, сайт изменил свою структуру."),
+    (r'unsupported url|неподдерживаемый url', re.I, "Ошибка: Неподдерживаемый URL или видеосервис."),
+    # Ошибки загрузки
+    (r'\A(?=.*download)(?=.*(?:failed|interrupted))', re.I | re.S,
+     "Ошибка загрузки. Проверьте соединение и попробуйте снова."),
+    (r'\A(?=.*disk)(?=.*(?:space|full))', re.I | re.S, "Ошибка: Недостаточно места на диске."),
+    (r'permission|доступ', re.I, "Ошибка: Недостаточно прав для записи в выбранную папку."),
+    # Ошибки cookies и авторизации
+    (r'cookies', re.I, "Ошибка с cookies. Попробуйте очистить cookies браузера."),
+    (r'login|authentication', re.I, "Ошибка авторизации. Возможно, требуется вход в аккаунт."),
+    # Общие ошибки
+    (r'cancelled|отменено', re.I, "Загрузка была отменена пользователем."),
+))
 
 
 class DownloadRunnable(QRunnable):
@@ -934,6 +1226,11 @@ class DownloadRunnable(QRunnable):
         """
         progress = pyqtSignal(str, float)
         finished = pyqtSignal(bool, str, str)
+
+    # Минимальный интервал между сигналами прогресса в секундах: yt-dlp вызывает
+    # хук сотни раз в секунду на фрагментированных потоках, а каждый сигнал
+    # передается в поток интерфейса через очередь событий
+    PROGRESS_EMIT_INTERVAL = 0.1
         
     def __init__(self, url: str, mode: str, resolution: Optional[str] = None,
                  output_dir: str = 'downloads') -> None:
@@ -954,6 +1251,8 @@ class DownloadRunnable(QRunnable):
         self.signals = self.Signals()
         self.cancel_event = threading.Event()
         self.downloaded_filename = None
+        # Время последнего отправленного сигнала прогресса
+        self._last_emit = 0.0
         
         os.makedirs(output_dir, exist_ok=True)
 
@@ -1016,8 +1315,12 @@ class DownloadRunnable(QRunnable):
             'retries': 10,
             'fragment_retries': 10,
             'retry_sleep': 3,
-            'http_chunk_size': 1024 * 1024,  # 1MB чанки
+            # Крупные диапазонные запросы: меньше HTTP-запросов на файл, а при
+            # замедлении сервером докачивается только текущий диапазон
+            'http_chunk_size': 10 * 1024 * 1024,  # 10MB чанки
             'buffersize': 1024 * 1024,       # 1MB буфер
+            # Фрагменты HLS/DASH загружаются параллельно в пределах одного видео
+            'concurrent_fragment_downloads': 4,
 
             # Обход ограничений
             'geo_bypass': True,
@@ -1076,84 +1379,16 @@ class DownloadRunnable(QRunnable):
         Returns:
             Понятное для пользователя сообщение об ошибке
         """
-        error_lower = error.lower()
-
-        # HTTP ошибки
-        if "HTTP Error 404" in error or "404" in error:
-            return "Ошибка: Видео не найдено (404). Возможно, оно было удалено или является приватным."
-        elif "HTTP Error 403" in error or "403" in error:
-            return "Ошибка: Доступ запрещен (403). Видео может быть недоступно в вашем регионе."
-        elif "HTTP Error 429" in error or "429" in error:
-            return "Ошибка: Слишком много запросов (429). Попробуйте позже."
-        elif "HTTP Error 500" in error or "500" in error:
-            return "Ошибка сервера (500). Попробуйте позже или выберите другое разрешение."
-        elif "HTTP Error 503" in error or "503" in error:
-            return "Сервис временно недоступен (503). Попробуйте позже."
-
-        # Ошибки авторизации и ограничений
-        elif "Sign in to confirm your age" in error or "age-restricted" in error:
-            return "Ошибка: Видео имеет возрастные ограничения и требует авторизации."
-        elif "private video" in error_lower or "приватное видео" in error_lower:
-            return "Ошибка: Это приватное видео, доступ к которому ограничен."
-        elif "members-only" in error_lower or "только для участников" in error_lower:
-            return "Ошибка: Видео доступно только для участников канала."
-        elif "premium" in error_lower and ("required" in error_lower or "необходим" in error_lower):
-            return "Ошибка: Для просмотра этого видео требуется премиум-подписка."
-
-        # Географические ограничения
-        elif "geo" in error_lower and ("block" in error_lower or "restrict" in error_lower):
-            return "Ошибка: Видео заблокировано в вашем регионе. Попробуйте использовать VPN."
-        elif "not available in your country" in error_lower:
-            return "Ошибка: Видео недоступно в вашей стране."
-
-        # Ошибки сети и подключения
-        elif any(keyword in error_lower for keyword in ["ssl", "подключени", "connect", "timeout", "network"]):
-            return "Ошибка подключения. Проверьте соединение с интернетом или попробуйте позже."
-        elif "dns" in error_lower:
-            return "Ошибка DNS. Проверьте настройки сети или попробуйте позже."
-
-        # Ошибки авторских прав
-        elif any(keyword in error_lower for keyword in ["copyright", "авторские права", "dmca"]):
-            return "Ошибка: Видео недоступно из-за нарушения авторских прав."
-
-        # Ошибки форматов и кодеков
-        elif "no video formats found" in error_lower or "форматы не найдены" in error_lower:
-            return "Ошибка: Не найдены подходящие форматы видео. Попробуйте другое разрешение."
-        elif "format not available" in error_lower:
-            return "Ошибка: Выбранный формат недоступен. Попробуйте другое разрешение."
-        elif "ffmpeg" in error_lower and "not found" in error_lower:
-            return "Ошибка: FFmpeg не найден. Установите FFmpeg для корректной работы."
-
-        # Ошибки экстракторов
-        elif "extractor" in error_lower and ("failed" in error_lower or "error" in error_lower):
-            return "Ошибка извлечения данных. Возможно, сайт изменил свою структуру."
-        elif "unsupported url" in error_lower or "неподдерживаемый url" in error_lower:
-            return "Ошибка: Неподдерживаемый URL или видеосервис."
-
-        # Ошибки загрузки
-        elif "download" in error_lower and ("failed" in error_lower or "interrupted" in error_lower):
-            return "Ошибка загрузки. Проверьте соединение и попробуйте снова."
-        elif "disk" in error_lower and ("space" in error_lower or "full" in error_lower):
-            return "Ошибка: Недостаточно места на диске."
-        elif "permission" in error_lower or "доступ" in error_lower:
-            return "Ошибка: Недостаточно прав для записи в выбранную папку."
-
-        # Ошибки cookies и авторизации
-        elif "cookies" in error_lower:
-            return "Ошибка с cookies. Попробуйте очистить cookies браузера."
-        elif "login" in error_lower or "authentication" in error_lower:
-            return "Ошибка авторизации. Возможно, требуется вход в аккаунт."
-
-        # Общие ошибки
-        elif "cancelled" in error_lower or "отменено" in error_lower:
-            return "Загрузка была отменена пользователем."
-        elif len(error.strip()) == 0:
+        # Правила проверяются по порядку, срабатывает первое совпавшее
+        for pattern, message in _ERROR_MESSAGE_RULES:
+            if pattern.search(error):
+                return message
+        if not error.strip():
             return "Произошла неизвестная ошибка."
-        else:
-            # Обрезаем слишком длинные сообщения
-            if len(error) > 200:
-                error = error[:200] + "..."
-            return f"Ошибка загрузки: {error}"
+        # Обрезаем слишком длинные сообщения
+        if len(error) > 200:
+            error = error[:200] + "..."
+        return f"Ошибка загрузки: {error}"
             
     def download_video(self) -> bool:
         """
@@ -1237,8 +1472,7 @@ class DownloadRunnable(QRunnable):
         Returns:
             Числовое значение разрешения
         """
-        import re
-        match = re.search(r'(\d+)p', resolution)
+        match = _RESOLUTION_NUMBER_RE.search(resolution)
         return match.group(1) if match else '720'
 
     def _create_video_format_selector(self, resolution_number: str) -> str:
@@ -1404,30 +1638,39 @@ class DownloadRunnable(QRunnable):
         if self.cancel_event.is_set():
             raise Exception("Загрузка отменена пользователем")
 
+        status = d.get('status')
+        if status == 'downloading':
+            # Хук работает вне блока try, поэтому отсутствующие значения заменяем нулем
+            downloaded: float = d.get('downloaded_bytes') or 0
+            total: float = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+            percent: float = (downloaded / total) * 100 if total else -1
+            # Промежуточные обновления чаще PROGRESS_EMIT_INTERVAL пропускаем
+            # вместе с проверкой памяти; окончание загрузки отправляется всегда
+            now = time.monotonic()
+            if now - self._last_emit < self.PROGRESS_EMIT_INTERVAL and percent < 99.9:
+                return
+            self._last_emit = now
+
         # Проверяем использование памяти
         if memory_monitor.is_memory_limit_exceeded():
             memory_monitor.force_garbage_collection()
             logger.warning("Превышен лимит памяти во время загрузки")
 
-        if d.get('status') == 'downloading':
+        if status == 'downloading':
             try:
-                downloaded: float = d.get('downloaded_bytes', 0)
-                total: float = d.get('total_bytes', 0) or d.get('total_bytes_estimate', 0)
-
                 # Логируем использование памяти для больших файлов
                 if total > 100 * 1024 * 1024:  # Файлы больше 100MB
                     if downloaded % (10 * 1024 * 1024) < 1024 * 1024:  # каждые 10MB
                         memory_monitor.log_memory_usage(f"загрузка {downloaded/(1024*1024):.1f}MB")
 
                 if total:
-                    percent: float = (downloaded / total) * 100
                     self.signals.progress.emit(f"Загрузка: {percent:.1f}%", percent)
                 else:
                     # Если размер неизвестен, отправляем неопределенный прогресс
                     self.signals.progress.emit("Загрузка...", -1)
             except Exception as e:
                 logger.exception("Ошибка в progress_hook")
-        elif d.get('status') == 'finished':
+        elif status == 'finished':
             self.downloaded_filename = os.path.basename(d.get('filename', ''))
             self.signals.progress.emit("Обработка файла...", 100)
             memory_monitor.log_memory_usage("завершение загрузки")
@@ -1440,21 +1683,35 @@ class DownloadRunnable(QRunnable):
 
 class DownloadManager:
     """Класс для управления загрузками видео и аудио."""
+
+    # Число одновременных загрузок по умолчанию
+    DEFAULT_MAX_PARALLEL = 3
     
-    def __init__(self, output_dir: str = 'downloads'):
+    def __init__(self, output_dir: str = 'downloads', max_parallel: int = DEFAULT_MAX_PARALLEL):
         """
         Инициализирует менеджер загрузок.
         
         Args:
             output_dir: Директория для сохранения загруженных файлов
+            max_parallel: Максимальное число одновременных загрузок
         """
         self.output_dir = output_dir
+        self.max_parallel = max(1, max_parallel)
         self.download_queue: List[Dict[str, Any]] = []
-        self.current_download: Optional[DownloadRunnable] = None
+        # Выполняющиеся загрузки: задача -> ее элемент очереди (в порядке запуска)
+        self.active_downloads: Dict[DownloadRunnable, Dict[str, Any]] = {}
+        # Пользователь отменил загрузки: новые элементы не запускаются до
+        # следующего запуска очереди
+        self.cancel_requested = False
         self.successful_downloads: List[Tuple[str, str]] = []
         self.failed_downloads: List[Tuple[str, str]] = []
         os.makedirs(output_dir, exist_ok=True)
 
+    @property
+    def current_download(self) -> Optional[DownloadRunnable]:
+        """Самая ранняя из выполняющихся загрузок или None."""
+        return next(iter(self.active_downloads), None)
+
     def set_output_dir(self, output_dir: str) -> None:
         """
         Устанавливает новую папку для сохранения файлов.
@@ -1499,22 +1756,31 @@ class DownloadManager:
             logger.info("Очередь загрузок пуста")
             return
         
-        if self.current_download is None:
+        self.cancel_requested = False
+        if not self.active_downloads:
             logger.info("Запуск очереди загрузок")
             self.process_queue()
 
     def process_queue(self) -> Optional[DownloadRunnable]:
         """
-        Обрабатывает следующий элемент в очереди.
+        Создает задачу для следующего ожидающего элемента очереди.
         
         Returns:
-            Объект DownloadRunnable или None, если очередь пуста
+            Объект DownloadRunnable или None, если ожидающих элементов нет
+            или уже выполняется max_parallel загрузок
         """
-        if not self.download_queue:
-            logger.info("Очередь загрузок завершена")
+        if self.cancel_requested or len(self.active_downloads) >= self.max_parallel:
+            return None
+
+        # Выполняющиеся элементы остаются в очереди до завершения, поэтому
+        # берем первый элемент, для которого загрузка еще не запущена
+        active_items = {id(item) for item in self.active_downloads.values()}
+        download = next((item for item in self.download_queue if id(item) not in active_items), None)
+        if download is None:
+            if not self.active_downloads:
+                logger.info("Очередь загрузок завершена")
             return None
 
-        download = self.download_queue[0]
         logger.info(f"Начало загрузки: {download['url']}, режим: {download['mode']}")
 
         download_runnable = DownloadRunnable(
@@ -1523,39 +1789,51 @@ class DownloadManager:
             download['resolution'],
             self.output_dir
         )
-        # Устанавливаем текущую загрузку до возврата объекта
-        self.current_download = download_runnable
-        logger.info("Установлена текущая загрузка")
+        # Регистрируем загрузку до возврата объекта
+        self.active_downloads[download_runnable] = download
+        download['_progress'] = 0
         return download_runnable
 
     def cancel_current_download(self) -> None:
-        """Отменяет текущую загрузку."""
-        if self.current_download:
-            logger.info("Отмена текущей загрузки...")
-            self.current_download.cancel()
+        """
+        Отменяет все выполняющиеся загрузки.
 
-    def on_download_finished(self, success: bool, message: str, filename: str) -> None:
+        Оставшиеся элементы очереди не запускаются, пока очередь
+        не будет запущена снова.
+        """
+        if self.active_downloads:
+            self.cancel_requested = True
+            logger.info("Отмена текущих загрузок...")
+            for download_runnable in list(self.active_downloads):
+                download_runnable.cancel()
+
+    def on_download_finished(self, download_runnable: DownloadRunnable, success: bool,
+                             message: str, filename: str) -> None:
         """
         Обработчик завершения загрузки.
 
         Args:
+            download_runnable: Завершившаяся задача загрузки
             success: Флаг успешной загрузки
             message: Сообщение о результате
             filename: Имя загруженного файла
         """
         if success:
             logger.info(f"Загрузка завершена успешно: {message}")
-            if self.current_download and filename:
-                self.successful_downloads.append((filename, self.current_download.url))
+            if filename:
+                self.successful_downloads.append((filename, download_runnable.url))
         else:
             logger.error(f"Ошибка загрузки: {message}")
-            if self.current_download:
-                self.failed_downloads.append((self.current_download.url, message))
-
-        if self.download_queue:
-            self.download_queue.pop(0)
+            self.failed_downloads.append((download_runnable.url, message))
 
-        self.current_download = None
+        # Загрузки завершаются в любом порядке, поэтому элемент удаляется
+        # по идентичности, а не с начала очереди
+        download = self.active_downloads.pop(download_runnable, None)
+        if download is not None:
+            for index, item in enumerate(self.download_queue):
+                if item is download:
+                    del self.download_queue[index]
+                    break
 
         # Очистка памяти после завершения загрузки
         memory_monitor.force_garbage_collection()
@@ -1627,9 +1905,9 @@ class DownloadManager:
         else:
             # Видео файлы всегда конвертируются в MP4
             # Убираем ID форматов из имени (например: .f140-9, .f244+251, .webm, .mkv)
-            clean_name = re.sub(r'\.f\d+[-+]?\d*', '', name_without_ext)  # Убираем .f140-9, .f244+251
-            clean_name = re.sub(r'\+\d+', '', clean_name)  # Убираем оставшиеся +251
-            clean_name = re.sub(r'\.webm$|\.mkv$|\.m4a$', '', clean_name)  # Убираем расширения
+            clean_name = _FORMAT_ID_SUFFIX_RE.sub('', name_without_ext)  # Убираем .f140-9, .f244+251
+            clean_name = _MERGED_FORMAT_ID_RE.sub('', clean_name)  # Убираем оставшиеся +251
+            clean_name = _MEDIA_EXTENSION_RE.sub('', clean_name)  # Убираем расширения
             return f"{clean_name}.mp4"
 
     def cleanup_temp_files(self) -> None:
@@ -1652,7 +1930,3 @@ class DownloadManager:
         self.successful_downloads.clear()
         self.failed_downloads.clear()
         logger.info("История загрузок сброшена")
-
-
-# Загружаем кэш при импорте модуля
-video_info_cache.load_from_file() 
\ No newline at end of file
@@ -13,20 +13,52 @@ from PyQt6.QtWidgets import (
     QListWidget, QProgressBar, QMessageBox, QApplication,
     QButtonGroup, QSplitter, QStatusBar, QSizePolicy, QToolTip
 )
-from PyQt6.QtCore import Qt, QThreadPool, QSettings, pyqtSignal, QSize
+from PyQt6.QtCore import Qt, QThreadPool, QSettings, QTimer, QStringListModel, pyqtSignal, QSize
 from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QPainter, QColor, QIcon
 
-import qtawesome as qta
-
 from utils import load_app_logo, load_image, setup_logging, get_resource_path
 from validators import VideoURL
 from downloader import (
-    DownloadManager, ResolutionWorker, 
-    video_info_cache, DownloadMode
+    DownloadManager, ResolutionRunnable, 
+    video_info_cache, resolution_cache, DownloadMode
 )
+import gui_dark_methods as _methods
 
 logger = logging.getLogger('VideoDownloader')
 
+# qtawesome загружает файлы шрифтов при импорте, поэтому импортируем его лениво
+qta = None
+
+
+def _qta():
+    """Возвращает модуль qtawesome, импортируя его при первом обращении."""
+    global qta
+    if qta is None:
+        import qtawesome as qta
+    return qta
+
+
+def _migrate_native_settings(settings: QSettings) -> None:
+    """
+    Однократно переносит настройки из прежнего системного хранилища
+    (реестр в Windows) в INI-файл, чтобы при обновлении не терялись
+    сохраненные окно, папка загрузок и выбранные режим и разрешение.
+
+    Args:
+        settings: Настройки в формате INI
+    """
+    # Перенос выполняется только пока INI-файл пуст
+    if settings.allKeys():
+        return
+    native_settings = QSettings("MaksK", "VideoDownloader")
+    keys = native_settings.allKeys()
+    if not keys:
+        return
+    for key in keys:
+        settings.setValue(key, native_settings.value(key))
+    settings.sync()
+    logger.info(f"Перенесено настроек из системного хранилища: {len(keys)}")
+
 
 class ThemeManager:
     """Класс для управления темой приложения."""
@@ -50,27 +82,56 @@ class ThemeManager:
         'icon': '#b0b0b0'
     }
     
+    # Доступные темы приложения
+    THEMES = {
+        'dark': DARK_THEME
+    }
+    
+    # Кэш собранных таблиц стилей по имени темы
+    _stylesheet_cache: Dict[str, str] = {}
+    
     @staticmethod
-    def get_theme() -> Dict[str, str]:
+    def get_theme(name: str = 'dark') -> Dict[str, str]:
         """
-        Возвращает цветовую схему темной темы.
+        Возвращает цветовую схему темы.
         
+        Args:
+            name: Имя темы
+            
         Returns:
             Словарь с цветовой схемой
         """
-        return ThemeManager.DARK_THEME
-        
+        return ThemeManager.THEMES.get(name, ThemeManager.DARK_THEME)
+    
     @staticmethod
-    def apply_theme(widget: QWidget) -> None:
+    def get_stylesheet(name: str = 'dark') -> str:
         """
-        Применяет темную тему к виджету.
+        Возвращает таблицу стилей для темы, собирая её только при первом запросе.
         
         Args:
-            widget: Виджет, к которому применяется тема
+            name: Имя темы
+            
+        Returns:
+            Строка с таблицей стилей
         """
-        colors = ThemeManager.get_theme()
+        stylesheet = ThemeManager._stylesheet_cache.get(name)
+        if stylesheet is None:
+            stylesheet = ThemeManager._build_stylesheet(ThemeManager.get_theme(name))
+            ThemeManager._stylesheet_cache[name] = stylesheet
+        return stylesheet
+    
+    @staticmethod
+    def _build_stylesheet(colors: Dict[str, str]) -> str:
+        """
+        Собирает таблицу стилей из цветовой схемы.
         
-        stylesheet = f"""
+        Args:
+            colors: Словарь с цветовой схемой
+            
+        Returns:
+            Строка с таблицей стилей
+        """
+        return f"""
         QWidget {{
             background-color: {colors['background']};
             color: {colors['foreground']};
@@ -119,7 +180,6 @@ class ThemeManager:
         
         QProgressBar::chunk {{
             background-color: {colors['primary']};
-            width: 1px;
         }}
         
         QListWidget {{
@@ -150,6 +210,14 @@ class ThemeManager:
             background-color: {colors['secondary_background']};
         }}
         
+        QLabel#statusLabel[state="ok"] {{
+            color: {colors['success']};
+        }}
+        
+        QLabel#statusLabel[state="warn"] {{
+            color: {colors['warning']};
+        }}
+        
         QStatusBar {{
             background-color: {colors['secondary_background']};
             color: {colors['foreground']};
@@ -163,7 +231,17 @@ class ThemeManager:
             padding: 4px;
         }}
         """
-        widget.setStyleSheet(stylesheet)
+        
+    @staticmethod
+    def apply_theme(widget: QWidget, name: str = 'dark') -> None:
+        """
+        Применяет тему к виджету.
+        
+        Args:
+            widget: Виджет, к которому применяется тема
+            name: Имя темы
+        """
+        widget.setStyleSheet(ThemeManager.get_stylesheet(name))
 
 
 class VideoDownloaderUI(QMainWindow):
@@ -172,8 +250,52 @@ class VideoDownloaderUI(QMainWindow):
     def __init__(self) -> None:
         """Инициализирует пользовательский интерфейс."""
         super().__init__()
+        # Единый экземпляр настроек; INI-файл избавляет от обращений к реестру Windows
+        self.settings = QSettings(
+            QSettings.Format.IniFormat, QSettings.Scope.UserScope,
+            "MaksK", "VideoDownloader"
+        )
+        _migrate_native_settings(self.settings)
+        # Ограничиваем число одновременных загрузок, чтобы не упираться в лимиты хостингов
+        self.download_manager = DownloadManager(max_parallel=self.settings.value(
+            "max_downloads", DownloadManager.DEFAULT_MAX_PARALLEL, type=int
+        ))
+        # Один поток сверх числа загрузок остается для получения разрешений
         self.thread_pool = QThreadPool()
-        self.download_manager = DownloadManager()
+        self.thread_pool.setMaxThreadCount(self.download_manager.max_parallel + 1)
+        # Текущая задача получения разрешений и номер последнего запроса
+        self.resolution_runnable = None
+        self._resolution_request_id = 0
+        # URL последней запущенной проверки и URL, для которого показаны разрешения
+        self._checking_url = None
+        self._last_checked_url = None
+        # Время последнего обновления прогресс-бара
+        self._last_progress_ts = 0.0
+        # Строки очереди загрузок, отображенные в последний раз
+        self._queue_row_cache = []
+        # Снимок очереди (элементы, прогресс активных загрузок), по которому строки были построены
+        self._queue_snapshot = None
+        # Очередь изменилась, пока окно было скрыто, и ждет перерисовки при показе
+        self._queue_dirty = False
+        # Диалог "О программе" создается при первом открытии
+        self._about_dialog = None
+        # Немодальное окно сводки загрузок и диалог сообщения о URL создаются при первом показе
+        self._summary_box = None
+        self._url_report_dialog = None
+        self._url_report_send_btn = None
+        # Диалог подтверждения очистки очереди создается при первом использовании
+        self._confirm_clear_queue = None
+        # Отложенная запись настроек на диск, объединяющая серию изменений
+        self._settings_sync_timer = QTimer(self)
+        self._settings_sync_timer.setSingleShot(True)
+        self._settings_sync_timer.setInterval(500)
+        self._settings_sync_timer.timeout.connect(self.settings.sync)
+        # Отложенная перерисовка очереди: прогресс параллельных загрузок
+        # объединяется в одно обновление строк не чаще раза в 100 мс
+        self._queue_refresh_timer = QTimer(self)
+        self._queue_refresh_timer.setSingleShot(True)
+        self._queue_refresh_timer.setInterval(100)
+        self._queue_refresh_timer.timeout.connect(self.update_queue_display)
         self.init_ui()
         self.load_settings()
         logger.info("Приложение запущено и готово к работе")
@@ -222,16 +344,27 @@ class VideoDownloaderUI(QMainWindow):
         self.url_input.setPlaceholderText("Вставьте ссылку на видео")
         self.url_input.setDragEnabled(True)
         
+        # Таймер для отложенной проверки URL при вводе: правки в течение
+        # интервала объединяются в одну проверку последнего введенного URL
+        self._url_debounce = QTimer(self)
+        self._url_debounce.setSingleShot(True)
+        self._url_debounce.setInterval(400)
+        self._url_debounce.timeout.connect(
+            lambda: self.check_url_for_resolutions(self.url_input.text().strip())
+        )
+        
+        self.url_input.textChanged.connect(self.on_url_text_changed)
+        
         # Подключаем обработку нажатия Enter в поле ввода URL
         self.url_input.returnPressed.connect(self.on_url_changed)
         
         # Добавляем иконку для поля ввода URL
-        url_icon = qta.icon('fa5s.link', color=ThemeManager.get_theme()['icon'])
+        url_icon = _qta().icon('fa5s.link', color=ThemeManager.get_theme()['icon'])
         self.url_input.addAction(url_icon, QLineEdit.ActionPosition.LeadingPosition)
         
         # Добавляем кнопку для проверки URL
         check_url_button = QPushButton("Проверить")
-        check_url_icon = qta.icon('fa5s.search', color=ThemeManager.get_theme()['button_text'])
+        check_url_icon = _qta().icon('fa5s.search', color=ThemeManager.get_theme()['button_text'])
         check_url_button.setIcon(check_url_icon)
         check_url_button.setToolTip("Проверить доступные разрешения для видео")
         check_url_button.clicked.connect(self.on_url_changed)
@@ -255,8 +388,8 @@ class VideoDownloaderUI(QMainWindow):
         self.video_radio.setChecked(True)
         
         # Добавляем иконки к радиокнопкам
-        video_icon = qta.icon('fa5s.video', color=ThemeManager.get_theme()['icon'])
-        audio_icon = qta.icon('fa5s.music', color=ThemeManager.get_theme()['icon'])
+        video_icon = _qta().icon('fa5s.video', color=ThemeManager.get_theme()['icon'])
+        audio_icon = _qta().icon('fa5s.music', color=ThemeManager.get_theme()['icon'])
         
         self.video_radio.setIcon(video_icon)
         self.audio_radio.setIcon(audio_icon)
@@ -276,7 +409,9 @@ class VideoDownloaderUI(QMainWindow):
         self.resolution_layout = QVBoxLayout(resolution_group_box)
         resolution_label = QLabel("Разрешение:")
         self.resolution_combo = QComboBox()
-        self.resolution_combo.addItems(['1080p', '720p', '480p', '360p', '240p'])
+        # Модель списка разрешений заменяется целиком при получении новых данных
+        self.resolution_model = QStringListModel(['1080p', '720p', '480p', '360p', '240p'])
+        self.resolution_combo.setModel(self.resolution_model)
         self.resolution_combo.setCurrentText('720p')
         
         self.resolution_layout.addWidget(resolution_label)
@@ -300,12 +435,12 @@ class VideoDownloaderUI(QMainWindow):
         self.folder_input.setReadOnly(True)
 
         # Добавляем иконку для поля папки
-        folder_icon = qta.icon('fa5s.folder', color=ThemeManager.get_theme()['icon'])
+        folder_icon = _qta().icon('fa5s.folder', color=ThemeManager.get_theme()['icon'])
         self.folder_input.addAction(folder_icon, QLineEdit.ActionPosition.LeadingPosition)
 
         # Кнопка выбора папки
         browse_button = QPushButton("Обзор")
-        browse_icon = qta.icon('fa5s.folder-open', color=ThemeManager.get_theme()['button_text'])
+        browse_icon = _qta().icon('fa5s.folder-open', color=ThemeManager.get_theme()['button_text'])
         browse_button.setIcon(browse_icon)
         browse_button.setToolTip("Выбрать папку для сохранения файлов")
         browse_button.clicked.connect(self.browse_folder)
@@ -319,7 +454,7 @@ class VideoDownloaderUI(QMainWindow):
 
         # Кнопка добавления в очередь с иконкой
         add_button = QPushButton("Добавить в очередь")
-        add_icon = qta.icon('fa5s.plus-circle', color=ThemeManager.get_theme()['button_text'])
+        add_icon = _qta().icon('fa5s.plus-circle', color=ThemeManager.get_theme()['button_text'])
         add_button.setIcon(add_icon)
         add_button.setIconSize(QSize(16, 16))
         add_button.clicked.connect(self.add_to_queue)
@@ -364,7 +499,7 @@ class VideoDownloaderUI(QMainWindow):
         
         # Кнопка очистки кэша с иконкой
         clear_cache_button = QPushButton()
-        clear_cache_icon = qta.icon('fa5s.trash-alt', color=ThemeManager.get_theme()['button_text'])
+        clear_cache_icon = _qta().icon('fa5s.trash-alt', color=ThemeManager.get_theme()['button_text'])
         clear_cache_button.setIcon(clear_cache_icon)
         clear_cache_button.setToolTip("Очистить кэш видео")
         clear_cache_button.clicked.connect(self.clear_cache)
@@ -395,7 +530,7 @@ class VideoDownloaderUI(QMainWindow):
         
         # Кнопка "Загрузить все" с иконкой
         self.start_button = QPushButton("Загрузить все")
-        start_icon = qta.icon('fa5s.download', color=ThemeManager.get_theme()['button_text'])
+        start_icon = _qta().icon('fa5s.download', color=ThemeManager.get_theme()['button_text'])
         self.start_button.setIcon(start_icon)
         self.start_button.setIconSize(QSize(16, 16))
         self.start_button.clicked.connect(self.start_downloads)
@@ -403,7 +538,7 @@ class VideoDownloaderUI(QMainWindow):
         
         # Кнопка "Отменить текущую" с иконкой
         cancel_button = QPushButton("Отменить")
-        cancel_icon = qta.icon('fa5s.stop-circle', color=ThemeManager.get_theme()['button_text'])
+        cancel_icon = _qta().icon('fa5s.stop-circle', color=ThemeManager.get_theme()['button_text'])
         cancel_button.setIcon(cancel_icon)
         cancel_button.setIconSize(QSize(16, 16))
         cancel_button.clicked.connect(self.cancel_download)
@@ -411,7 +546,7 @@ class VideoDownloaderUI(QMainWindow):
         
         # Кнопка "Удалить выбранное" с иконкой
         remove_button = QPushButton("Удалить")
-        remove_icon = qta.icon('fa5s.minus-circle', color=ThemeManager.get_theme()['button_text'])
+        remove_icon = _qta().icon('fa5s.minus-circle', color=ThemeManager.get_theme()['button_text'])
         remove_button.setIcon(remove_icon)
         remove_button.setIconSize(QSize(16, 16))
         remove_button.clicked.connect(self.remove_selected)
@@ -419,7 +554,7 @@ class VideoDownloaderUI(QMainWindow):
         
         # Кнопка "Очистить очередь" с иконкой
         clear_button = QPushButton("Очистить")
-        clear_icon = qta.icon('fa5s.trash', color=ThemeManager.get_theme()['button_text'])
+        clear_icon = _qta().icon('fa5s.trash', color=ThemeManager.get_theme()['button_text'])
         clear_button.setIcon(clear_icon)
         clear_button.setIconSize(QSize(16, 16))
         clear_button.clicked.connect(self.clear_queue)
@@ -436,8 +571,9 @@ class VideoDownloaderUI(QMainWindow):
         self.splitter.addWidget(self.left_panel)
         self.splitter.addWidget(self.right_panel)
         
-        # Устанавливаем начальные размеры панелей (40% : 60%)
-        self.splitter.setSizes([400, 600])
+        # Начальные размеры панелей (40% : 60%) задаются в showEvent,
+        # когда геометрия окна уже восстановлена из настроек
+        self._splitter_sizes_pending = True
         
         # Добавляем сплиттер в основной макет
         main_layout.addWidget(self.splitter)
@@ -455,14 +591,21 @@ class VideoDownloaderUI(QMainWindow):
         # Включаем возможность принимать перетаскивание файлов
         self.setAcceptDrops(True)
 
-    # Импортируем методы из gui_dark_methods.py
-    from gui_dark_methods import (
-        apply_theme, dragEnterEvent, dropEvent, load_settings, save_settings,
-        add_to_queue, update_queue_display, start_downloads, update_progress,
-        on_download_finished, show_download_summary, reset_ui_after_downloads,
-        clear_download_history, cancel_download, clear_queue, remove_selected,
-        show_about_dialog, show_url_report_dialog, set_controls_enabled,
-        on_mode_changed, closeEvent, clear_cache, on_url_changed,
-        check_url_for_resolutions, update_resolutions, on_resolution_error,
-        browse_folder
-    )
\ No newline at end of file
+
+# Методы интерфейса, вынесенные в gui_dark_methods.py
+_UI_METHOD_NAMES = (
+    'apply_theme', 'dragEnterEvent', 'dropEvent', 'load_settings', 'save_settings',
+    'save_download_prefs', 'add_to_queue', 'update_queue_display', 'start_downloads',
+    'update_progress', 'on_download_finished', 'show_download_summary', 'reset_ui_after_downloads',
+    'clear_download_history', 'cancel_download', 'clear_queue', 'remove_selected',
+    'show_about_dialog', 'show_url_report_dialog', 'set_controls_enabled',
+    'on_mode_changed', 'showEvent', 'closeEvent', 'clear_cache', 'on_url_changed',
+    'on_url_text_changed',
+    'check_url_for_resolutions', 'update_resolutions', 'on_resolution_error',
+    'browse_folder'
+)
+
+# Привязываем методы к классу один раз при импорте модуля
+for _name in _UI_METHOD_NAMES:
+    setattr(VideoDownloaderUI, _name, getattr(_methods, _name))
+del _name
@@ -6,12 +6,27 @@
 """
 
 import os
-from PyQt6.QtWidgets import QMessageBox, QPushButton, QApplication
-from PyQt6.QtCore import Qt
+import time
+import logging
+import threading
+import webbrowser
+from collections import deque
+from functools import partial
+from typing import List, Tuple
+from PyQt6.QtWidgets import QMainWindow, QMessageBox, QPushButton, QApplication, QFileDialog
+from PyQt6.QtCore import Qt, QSignalBlocker
 
 from utils import load_app_logo
 from validators import VideoURL
-from downloader import ResolutionWorker
+from downloader import ResolutionRunnable, video_info_cache, resolution_cache
+
+logger = logging.getLogger('VideoDownloader')
+
+# Разрешения, которые допускается восстанавливать из сохраненных настроек
+_ALLOWED_RESOLUTIONS = frozenset(('1080p', '720p', '480p', '360p', '240p'))
+
+# Имена файлов логов неизвестных форматов URL для всех поддерживаемых сервисов
+_UNKNOWN_LOG_NAMES = frozenset(f"unknown_{service.lower()}_urls.log" for service in VideoURL.URL_PATTERNS)
 
 
 def apply_theme(self) -> None:
@@ -45,9 +60,6 @@ def check_url_for_resolutions(self, url: str) -> None:
     Args:
         url: URL видео для проверки
     """
-    import logging
-    logger = logging.getLogger('VideoDownloader')
-    
     url = url.strip()
     if not url:
         return
@@ -57,9 +69,33 @@ def check_url_for_resolutions(self, url: str) -> None:
     if not is_valid:
         return
         
+    # Проверка повторяется при каждом изменении поля ввода, поэтому сообщения
+    # о пропуске выводятся только на уровне DEBUG
     # Проверяем, включен ли режим видео (для аудио разрешения не нужны)
     if not self.video_radio.isChecked():
-        logger.info("Режим аудио: пропуск получения разрешений")
+        logger.debug("Режим аудио: пропуск получения разрешений")
+        return
+        
+    # Повторный запрос того же URL не нужен, пока предыдущий еще выполняется
+    if url == self._checking_url and self.resolution_runnable is not None:
+        logger.debug("Разрешения для URL уже запрошены: %s", url)
+        return
+        
+    # Если разрешения для этого URL уже известны, обходимся без yt-dlp;
+    # список по умолчанию в кэш не попадает, поэтому после неудачной
+    # проверки URL запрашивается повторно
+    cached_resolutions = resolution_cache.get(url)
+    if cached_resolutions is not None and url == self._last_checked_url == self._checking_url:
+        logger.debug("Разрешения для URL уже получены: %s", url)
+        return
+    self._checking_url = url
+    if cached_resolutions is not None:
+        if self.resolution_runnable is not None:
+            self.resolution_runnable.cancel()
+            self.resolution_runnable = None
+        self._resolution_request_id += 1
+        logger.info(f"Разрешения получены из кэша для: {url}")
+        self.update_resolutions(self._resolution_request_id, cached_resolutions, True)
         return
         
     # Устанавливаем текст статуса
@@ -73,61 +109,56 @@ def check_url_for_resolutions(self, url: str) -> None:
     # Временно отключаем кнопку добавления в очередь
     self.set_controls_enabled(False)
     
-    # Создаем и запускаем ResolutionWorker
-    # Сохраняем ссылку на объект ResolutionWorker как атрибут класса
-    if hasattr(self, 'resolution_worker') and self.resolution_worker is not None:
-        try:
-            # Если предыдущий worker еще работает, отсоединяем его сигналы
-            self.resolution_worker.resolutions_found.disconnect()
-            self.resolution_worker.error_occurred.disconnect()
-            self.resolution_worker.terminate()
-            self.resolution_worker.wait(1000)  # Ждем максимум 1 секунду
-        except Exception as e:
-            logger.error(f"Ошибка при остановке предыдущего потока: {e}")
-    
-    # Создаем новый поток
-    self.resolution_worker = ResolutionWorker(url)
-    self.resolution_worker.resolutions_found.connect(self.update_resolutions)
-    self.resolution_worker.error_occurred.connect(self.on_resolution_error)
-    self.resolution_worker.start()
+    # Отменяем предыдущую задачу: она завершится сама, а ее поздний
+    # результат будет отброшен по идентификатору запроса
+    if self.resolution_runnable is not None:
+        self.resolution_runnable.cancel()
+    
+    # Создаем новую задачу и запускаем ее в общем пуле потоков
+    self._resolution_request_id += 1
+    self.resolution_runnable = ResolutionRunnable(url, self._resolution_request_id)
+    self.resolution_runnable.signals.resolutions_found.connect(self.update_resolutions)
+    self.resolution_runnable.signals.error_occurred.connect(self.on_resolution_error)
+    # Повышенный приоритет: ожидающий результата пользователь обслуживается
+    # раньше задач, уже стоящих в очереди пула
+    self.thread_pool.start(self.resolution_runnable, 1)
     logger.info(f"Запущен поиск доступных разрешений для: {url}")
 
-def update_resolutions(self, resolutions: list) -> None:
+def update_resolutions(self, request_id: int, resolutions: list, probed: bool) -> None:
     """
     Обновляет выпадающий список с доступными разрешениями.
     
     Args:
+        request_id: Идентификатор запроса, к которому относится результат
         resolutions: Список доступных разрешений
+        probed: Список получен от yt-dlp или из кэша, а не подставлен по умолчанию
     """
-    import logging
-    logger = logging.getLogger('VideoDownloader')
-    
-    # Проверяем, что поток еще существует и активен
-    if not hasattr(self, 'resolution_worker') or self.resolution_worker is None:
-        logger.warning("Получен ответ от несуществующего потока ResolutionWorker")
+    # Проверяем, что результат относится к текущему запросу
+    if request_id != self._resolution_request_id:
+        logger.warning("Получен устаревший ответ ResolutionRunnable, пропускаем")
         return
     
-    # Блокируем сигналы комбобокса, чтобы избежать срабатывания событий
-    self.resolution_combo.blockSignals(True)
-    
-    # Запоминаем текущее выбранное разрешение
-    current_resolution = self.resolution_combo.currentText()
-    
-    # Очищаем комбобокс
-    self.resolution_combo.clear()
-    
-    # Заполняем найденными разрешениями
-    self.resolution_combo.addItems(resolutions)
-    
-    # Пытаемся восстановить ранее выбранное разрешение
-    if current_resolution in resolutions:
-        self.resolution_combo.setCurrentText(current_resolution)
-    else:
-        # Если прежнего разрешения нет, выбираем наилучшее
-        self.resolution_combo.setCurrentIndex(0)
+    # Блокируем сигналы комбобокса, чтобы избежать срабатывания событий;
+    # блокировка снимается при выходе из блока, даже если возникло исключение
+    with QSignalBlocker(self.resolution_combo):
+        # Запоминаем текущее выбранное разрешение
+        current_resolution = self.resolution_combo.currentText()
+        
+        # Заменяем список разрешений одной операцией над моделью
+        self.resolution_combo.setUpdatesEnabled(False)
+        self.resolution_model.setStringList(resolutions)
+        self.resolution_combo.setUpdatesEnabled(True)
+        
+        # Пытаемся восстановить ранее выбранное разрешение
+        if current_resolution in resolutions:
+            self.resolution_combo.setCurrentText(current_resolution)
+        else:
+            # Если прежнего разрешения нет, выбираем наилучшее
+            self.resolution_combo.setCurrentIndex(0)
     
-    # Разблокируем сигналы
-    self.resolution_combo.blockSignals(False)
+    # Запоминаем URL, для которого показаны разрешения; после подстановки
+    # списка по умолчанию повторная проверка того же URL должна быть возможна
+    self._last_checked_url = self._checking_url if probed else None
     
     # Обновляем UI
     self.status_label.setText("Информация о видео получена")
@@ -138,26 +169,28 @@ def update_resolutions(self, resolutions: list) -> None:
     # Включаем элементы управления
     self.set_controls_enabled(True)
     
-    # Освобождаем объект ResolutionWorker
-    self.resolution_worker = None
+    # Освобождаем задачу получения разрешений
+    self.resolution_runnable = None
     
     logger.info(f"Получены разрешения: {resolutions}")
 
-def on_resolution_error(self, error_message: str) -> None:
+def on_resolution_error(self, request_id: int, error_message: str) -> None:
     """
     Обрабатывает ошибку получения разрешений.
     
     Args:
+        request_id: Идентификатор запроса, к которому относится ошибка
         error_message: Сообщение об ошибке
     """
-    import logging
-    logger = logging.getLogger('VideoDownloader')
-    
-    # Проверяем, что поток еще существует и активен
-    if not hasattr(self, 'resolution_worker') or self.resolution_worker is None:
-        logger.warning("Получена ошибка от несуществующего потока ResolutionWorker")
+    # Проверяем, что ошибка относится к текущему запросу
+    if request_id != self._resolution_request_id:
+        logger.warning("Получена устаревшая ошибка ResolutionRunnable, пропускаем")
         return
     
+    # Разрешения не получены, повторная проверка этого URL должна быть возможна
+    self._checking_url = None
+    self._last_checked_url = None
+    
     # Восстанавливаем интерфейс
     self.status_label.setText("Ошибка получения информации")
     self.statusBar.showMessage(error_message)
@@ -167,20 +200,30 @@ def on_resolution_error(self, error_message: str) -> None:
     # Включаем элементы управления
     self.set_controls_enabled(True)
     
-    # Освобождаем объект ResolutionWorker
-    self.resolution_worker = None
+    # Освобождаем задачу получения разрешений
+    self.resolution_runnable = None
     
     logger.error(f"Ошибка получения разрешений: {error_message}")
 
 def on_url_changed(self) -> None:
-    """Обработчик изменения URL в поле ввода."""
-    url = self.url_input.text().strip()
-    self.check_url_for_resolutions(url)
+    """Обработчик явной проверки URL (Enter или кнопка "Проверить"): проверка запускается сразу."""
+    # Отложенная проверка того же текста больше не нужна
+    self._url_debounce.stop()
+    self.check_url_for_resolutions(self.url_input.text().strip())
+
+def on_url_text_changed(self, text: str) -> None:
+    """
+    Обработчик правки текста URL: проверка запускается после паузы во вводе.
+    
+    Args:
+        text: Новый текст поля ввода
+    """
+    # Каждая правка перезапускает таймер, поэтому проверяется только итоговый URL
+    self._url_debounce.start()
     
 def load_settings(self) -> None:
     """Загружает настройки приложения."""
-    from PyQt6.QtCore import QSettings
-    settings = QSettings("MaksK", "VideoDownloader")
+    settings = self.settings
     
     # Загружаем состояние окна
     if settings.contains("geometry"):
@@ -190,7 +233,7 @@ def load_settings(self) -> None:
         
     # Загружаем другие настройки
     resolution = settings.value("resolution", "720p", type=str)
-    if resolution in ['1080p', '720p', '480p', '360p', '240p']:
+    if resolution in _ALLOWED_RESOLUTIONS:
         self.resolution_combo.setCurrentText(resolution)
         
     mode = settings.value("mode", "video", type=str)
@@ -200,7 +243,6 @@ def load_settings(self) -> None:
         self.video_radio.setChecked(True)
 
     # Загружаем папку для сохранения
-    import os
     default_folder = os.path.join(os.path.expanduser("~"), "Downloads")
     folder_path = settings.value("output_folder", default_folder, type=str)
     if os.path.exists(folder_path):
@@ -208,63 +250,64 @@ def load_settings(self) -> None:
     else:
         self.folder_input.setText(default_folder)
         
-    # Размеры сплиттера
-    if settings.contains("splitter_sizes"):
-        try:
-            # Преобразуем значение в список целых чисел
-            sizes_str = settings.value("splitter_sizes")
-            if isinstance(sizes_str, str):
-                # Если значение строка, пытаемся разобрать её
-                sizes = [int(x) for x in sizes_str.strip('[]').split(',') if x.strip().isdigit()]
-                if len(sizes) >= 2:  # Убеждаемся, что у нас есть хотя бы 2 значения
-                    self.splitter.setSizes(sizes)
-            elif isinstance(sizes_str, list) and len(sizes_str) >= 2:
-                # Если значение уже список, просто конвертируем в int
-                sizes = [int(x) if isinstance(x, (int, str)) and str(x).isdigit() else 0 for x in sizes_str]
-                self.splitter.setSizes(sizes)
-        except Exception as e:
-            import logging
-            logger = logging.getLogger('VideoDownloader')
-            logger.error(f"Ошибка при установке размеров сплиттера: {e}")
-            # Устанавливаем размеры по умолчанию
-            self.splitter.setSizes([400, 600])
+    # Состояние сплиттера (двоичный блок Qt)
+    splitter_state = settings.value("splitter_state")
+    if splitter_state and self.splitter.restoreState(splitter_state):
+        self._splitter_sizes_pending = False
+    elif settings.contains("splitter_sizes"):
+        # Однократная миграция со старого формата: список размеров панелей
+        sizes = settings.value("splitter_sizes")
+        if isinstance(sizes, list) and len(sizes) >= 2 and all(str(x).isdigit() for x in sizes):
+            self.splitter.setSizes([int(x) for x in sizes])
+            self._splitter_sizes_pending = False
+
+def save_download_prefs(self) -> None:
+    """
+    Сохраняет параметры загрузки (разрешение, режим, папку).
+    
+    Записываются только изменившиеся значения, а запись на диск
+    откладывается таймером, чтобы объединить серию изменений.
+    """
+    settings = self.settings
+    prefs = {
+        "resolution": self.resolution_combo.currentText(),
+        "mode": "audio" if self.audio_radio.isChecked() else "video",
+    }
+    
+    # Сохраняем папку для сохранения
+    folder_path = self.folder_input.text().strip()
+    if folder_path:
+        prefs["output_folder"] = folder_path
+    
+    changed = False
+    for key, value in prefs.items():
+        if settings.value(key) != value:
+            settings.setValue(key, value)
+            changed = True
+    
+    if changed:
+        self._settings_sync_timer.start()
 
 def save_settings(self) -> None:
-    """Сохраняет настройки приложения."""
-    from PyQt6.QtCore import QSettings
-    settings = QSettings("MaksK", "VideoDownloader")
+    """Сохраняет все настройки приложения, включая состояние окна, и сразу записывает их на диск."""
+    settings = self.settings
     settings.setValue("geometry", self.saveGeometry())
     settings.setValue("windowState", self.saveState())
     
     # Сохраняем настройки загрузки
-    resolution = self.resolution_combo.currentText()
-    settings.setValue("resolution", resolution)
+    self.save_download_prefs()
+    settings.setValue("max_downloads", self.download_manager.max_parallel)
     
-    mode = "audio" if self.audio_radio.isChecked() else "video"
-    settings.setValue("mode", mode)
-
-    # Сохраняем папку для сохранения
-    folder_path = self.folder_input.text().strip()
-    if folder_path:
-        settings.setValue("output_folder", folder_path)
+    # Сохраняем состояние сплиттера; старый ключ больше не нужен
+    settings.setValue("splitter_state", self.splitter.saveState())
+    settings.remove("splitter_sizes")
     
-    # Сохраняем размеры сплиттера
-    try:
-        splitter_sizes = self.splitter.sizes()
-        # Сохраняем как список целых чисел
-        settings.setValue("splitter_sizes", splitter_sizes)
-    except Exception as e:
-        import logging
-        logger = logging.getLogger('VideoDownloader')
-        logger.error(f"Ошибка при сохранении размеров сплиттера: {e}")
+    # Записываем настройки немедленно, отложенная запись больше не нужна
+    self._settings_sync_timer.stop()
+    settings.sync()
 
 def browse_folder(self) -> None:
     """Открывает диалог выбора папки для сохранения файлов."""
-    from PyQt6.QtWidgets import QFileDialog
-    import os
-    import logging
-    logger = logging.getLogger('VideoDownloader')
-
     # Получаем текущую папку или используем папку Downloads по умолчанию
     current_folder = self.folder_input.text().strip()
     if not current_folder or not os.path.exists(current_folder):
@@ -281,12 +324,11 @@ def browse_folder(self) -> None:
     if folder:
         self.folder_input.setText(folder)
         # Сохраняем выбранную папку в настройках
-        self.save_settings()
+        self.save_download_prefs()
         logger.info(f"Выбрана папка для сохранения: {folder}")
 
 def add_to_queue(self) -> None:
     """Добавляет текущий URL в очередь загрузок."""
-    import os
 
     url: str = self.url_input.text().strip()
 
@@ -319,25 +361,73 @@ def add_to_queue(self) -> None:
     if self.download_manager.add_to_queue(url, mode, resolution):
         self.update_queue_display()
         self.url_input.clear()
-        self.save_settings()
+        self.save_download_prefs()
         self.status_label.setText("Видео добавлено в очередь")
     else:
         QMessageBox.warning(self, "Ошибка", "Не удалось добавить видео в очередь")
 
 def update_queue_display(self) -> None:
-    """Обновляет отображение очереди загрузок."""
-    self.queue_list.clear()
-    for i, item in enumerate(self.download_manager.download_queue, 1):
-        mode_text = f"видео ({item['resolution']})" if item['mode'] == "video" else "аудио"
-        # Проверяем, является ли текущий элемент активной загрузкой
-        is_current = (
-            self.download_manager.current_download is not None and
-            i == 1  # Первый элемент в очереди всегда является текущей загрузкой
-        )
-        prefix = "⌛" if is_current else " "
-        self.queue_list.addItem(
-            f"{prefix} {i}. [{item.get('service', 'Неизвестный сервис')}] {item['url']} - {mode_text}"
-        )
+    """
+    Обновляет отображение очереди загрузок.
+    
+    Пока окно скрыто или свернуто, обновление откладывается до его показа.
+    """
+    self._queue_dirty = True
+    if self.queue_list.isVisible() and not self.isMinimized():
+        _do_update_queue_display(self)
+
+def _do_update_queue_display(self) -> None:
+    """
+    Перерисовывает список очереди загрузок.
+    
+    Изменяются только строки, текст которых отличается от уже отображенного.
+    """
+    self._queue_dirty = False
+    # Строки полностью определяются набором элементов и прогрессом активных загрузок;
+    # сравнение кортежей сначала проверяет идентичность элементов, поэтому дешево
+    queue = self.download_manager.download_queue
+    progress = tuple(item.get('_progress') for item in queue)
+    snapshot = (tuple(queue), progress)
+    if snapshot == self._queue_snapshot:
+        return
+    self._queue_snapshot = snapshot
+
+    rows = []
+    for i, (item, item_progress) in enumerate(zip(queue, progress), 1):
+        # Неизменяемая часть строки элемента вычисляется один раз и хранится в нем самом
+        display = item.get('_display')
+        if display is None:
+            mode_text = f"видео ({item['resolution']})" if item['mode'] == "video" else "аудио"
+            display = f"[{item.get('service', 'Неизвестный сервис')}] {item['url']} - {mode_text}"
+            item['_display'] = display
+        if item_progress is None:
+            rows.append(f"  {i}. {display}")
+        else:
+            # Выполняющаяся загрузка отмечается и показывает собственный прогресс
+            rows.append(f"⌛ {i}. {display} ({item_progress}%)")
+
+    old_rows = self._queue_row_cache
+    if rows == old_rows:
+        return
+
+    # Все изменения строк применяются одной перерисовкой списка
+    self.queue_list.setUpdatesEnabled(False)
+    try:
+        if not rows:
+            self.queue_list.clear()
+        else:
+            # Обновляем текст совпадающих по позиции строк
+            for row in range(min(len(old_rows), len(rows))):
+                if old_rows[row] != rows[row]:
+                    self.queue_list.item(row).setText(rows[row])
+            # Удаляем лишние строки с конца или добавляем недостающие
+            for row in range(len(old_rows) - 1, len(rows) - 1, -1):
+                self.queue_list.takeItem(row)
+            if len(rows) > len(old_rows):
+                self.queue_list.addItems(rows[len(old_rows):])
+    finally:
+        self.queue_list.setUpdatesEnabled(True)
+    self._queue_row_cache = rows
 
 def start_downloads(self) -> None:
     """Запускает процесс загрузки файлов из очереди."""
@@ -347,76 +437,151 @@ def start_downloads(self) -> None:
 
     self.set_controls_enabled(False)
     self.start_button.setEnabled(False)  # Дополнительно деактивируем кнопку "Загрузить все"
-    download_runnable = self.download_manager.process_queue()
-    if download_runnable:
-        download_runnable.signals.progress.connect(self.update_progress)
-        download_runnable.signals.finished.connect(self.on_download_finished)
-        self.thread_pool.start(download_runnable)
-        # Обновляем отображение очереди сразу после запуска загрузки
+    # Новый запуск снимает остановку очереди после отмены
+    self.download_manager.cancel_requested = False
+    if _start_pending_downloads(self):
+        # Обновляем отображение очереди сразу после запуска загрузок
         self.update_queue_display()
 
-def update_progress(self, status: str, percent: float) -> None:
+def _start_pending_downloads(self) -> bool:
+    """
+    Запускает ожидающие элементы очереди, пока есть свободные места для загрузок.
+    
+    Returns:
+        True, если запущена хотя бы одна загрузка, иначе False
+    """
+    started = False
+    while _start_next_download(self):
+        started = True
+    return started
+
+def _start_next_download(self) -> bool:
+    """
+    Запускает загрузку следующего ожидающего элемента очереди в пуле потоков.
+    
+    Состояние элементов управления не меняется: оно задается один раз
+    в start_downloads и восстанавливается после завершения всей очереди.
+    
+    Returns:
+        True, если загрузка запущена, иначе False
+    """
+    download_runnable = self.download_manager.process_queue()
+    if not download_runnable:
+        return False
+    # Явная очередь сигналов: следующая загрузка запускается из цикла событий,
+    # а не вложенным вызовом внутри обработчика завершения предыдущей.
+    # Сигналы не несут отправителя, поэтому задача передается в обработчики явно
+    queued = Qt.ConnectionType.QueuedConnection
+    download_runnable.signals.progress.connect(partial(self.update_progress, download_runnable), queued)
+    download_runnable.signals.finished.connect(partial(self.on_download_finished, download_runnable), queued)
+    self.thread_pool.start(download_runnable)
+    return True
+
+def update_progress(self, download_runnable, status: str, percent: float) -> None:
     """
     Обновляет отображение прогресса загрузки.
     
+    Прогресс каждой загрузки показывается в ее строке очереди; метка статуса
+    и прогресс-бар отражают самую раннюю из выполняющихся загрузок.
+    
     Args:
+        download_runnable: Задача загрузки, приславшая обновление
         status: Текстовый статус загрузки
         percent: Процент завершения загрузки
     """
-    self.status_label.setText(status)
+    manager = self.download_manager
+    item = manager.active_downloads.get(download_runnable)
+    if item is None:
+        # Загрузка уже завершена или удалена из очереди
+        return
+    if percent >= 0 and item.get('_progress') != int(percent):
+        item['_progress'] = int(percent)
+        if not self._queue_refresh_timer.isActive():
+            self._queue_refresh_timer.start()
+    if download_runnable is not manager.current_download:
+        return
+    # setText у метки со стилем вызывает пересчет стилей, поэтому меняем только новый текст
+    if status != self.status_label.text():
+        self.status_label.setText(status)
+    # Прогресс-бар читается в каждом тике загрузки, поэтому берем его в локальную переменную
+    bar = self.progress_bar
+    # Состояние неопределенного прогресса хранит сам прогресс-бар (диапазон 0..0)
+    indeterminate = bar.maximum() == 0
     if percent >= 0:
-        self.progress_bar.setValue(int(percent))
-    else:
+        if indeterminate:
+            bar.setRange(0, 100)
+        # yt-dlp присылает много обновлений в пределах одного процента — их пропускаем
+        pct = int(percent)
+        if pct == bar.value():
+            return
+        # Перерисовываем прогресс-бар не чаще раза в 50 мс, кроме завершения
+        now = time.monotonic()
+        if now - self._last_progress_ts > 0.05 or percent >= 100:
+            self._last_progress_ts = now
+            bar.setValue(pct)
+    elif not indeterminate:
         # Если процент отрицательный, показываем неопределенный прогресс
-        self.progress_bar.setRange(0, 0)
-    # Уменьшаем частоту вызовов processEvents, чтобы не нарушать основной цикл событий
-    # Вызываем только раз в 5 обновлений
-    self.progress_update_counter = getattr(self, 'progress_update_counter', 0) + 1
-    if self.progress_update_counter % 5 == 0:
-        QApplication.processEvents()
+        bar.setRange(0, 0)
 
-def on_download_finished(self, success: bool, message: str, filename: str) -> None:
+def on_download_finished(self, download_runnable, success: bool, message: str, filename: str) -> None:
     """
     Обработчик завершения загрузки.
     
     Args:
+        download_runnable: Завершившаяся задача загрузки
         success: Флаг успешной загрузки
         message: Сообщение о результате
         filename: Имя загруженного файла
     """
-    self.download_manager.on_download_finished(success, message, filename)
-    self.update_queue_display()
+    manager = self.download_manager
+    manager.on_download_finished(download_runnable, success, message, filename)
+    # Освободившееся место занимает следующий ожидающий элемент очереди
+    _start_pending_downloads(self)
 
-    if not self.download_manager.download_queue:
+    if not manager.active_downloads:
+        self.update_queue_display()
         self.show_download_summary()
         self.set_controls_enabled(True)
         self.start_button.setEnabled(True)  # Включаем кнопку "Загрузить все"
         self.reset_ui_after_downloads()  # Сбрасываем UI после загрузок
     else:
-        self.start_downloads()
+        # Очередь перерисовывается один раз, уже с новыми активными элементами
+        self.update_queue_display()
 
 def show_download_summary(self) -> None:
     """Показывает сводку о результатах загрузок."""
     summary = self.download_manager.get_download_summary()
     if summary:
         self.download_manager.cleanup_temp_files()
-        msg_box = QMessageBox(self)
-        msg_box.setWindowTitle("Загрузка завершена")
-        msg_box.setText(summary)
-        
-        # Добавляем кнопку для сброса истории загрузок
-        clear_history_btn = QPushButton("Очистить историю")
-        clear_history_btn.clicked.connect(self.clear_download_history)
-        
-        msg_box.addButton(QMessageBox.StandardButton.Ok)
-        msg_box.addButton(clear_history_btn, QMessageBox.ButtonRole.ActionRole)
-        
-        msg_box.exec()
+        # Окно сводки создается один раз; для новой партии меняется только текст
+        if self._summary_box is None:
+            self._summary_box = _build_summary_box(self)
+        self._summary_box.setText(summary)
+        # Немодальный показ: окно не блокирует новые загрузки, пока открыто
+        self._summary_box.show()
+        self._summary_box.raise_()
+
+def _build_summary_box(self) -> QMessageBox:
+    """
+    Создает немодальное окно сводки о результатах загрузок.
+    
+    Returns:
+        Настроенный QMessageBox
+    """
+    msg_box = QMessageBox(self)
+    msg_box.setWindowTitle("Загрузка завершена")
+    msg_box.setModal(False)
+    
+    # Добавляем кнопку для сброса истории загрузок
+    clear_history_btn = QPushButton("Очистить историю")
+    clear_history_btn.clicked.connect(self.clear_download_history)
+    
+    msg_box.addButton(QMessageBox.StandardButton.Ok)
+    msg_box.addButton(clear_history_btn, QMessageBox.ButtonRole.ActionRole)
+    return msg_box
 
 def reset_ui_after_downloads(self) -> None:
     """Сбрасывает UI после завершения загрузок."""
-    import logging
-    logger = logging.getLogger('VideoDownloader')
     # Очищаем поле URL
     self.url_input.clear()
     
@@ -425,13 +590,29 @@ def reset_ui_after_downloads(self) -> None:
     
     # Обновляем статус
     self.status_label.setText("Загрузки завершены. Готов к новым задачам.")
-    self.status_label.setStyleSheet("color: green;")
+    _set_status_state(self, "ok")
     
     # Обновляем очередь загрузок
     self.update_queue_display()
     
     logger.info("UI сброшен после загрузок")
 
+def _set_status_state(self, state: str) -> None:
+    """
+    Задает цвет метки статуса через свойство, описанное в стилях темы.
+    
+    Args:
+        state: Состояние статуса ("ok" или "warn")
+    """
+    label = self.status_label
+    if label.property("state") == state:
+        return
+    label.setProperty("state", state)
+    # Переприменяем уже разобранную таблицу стилей без разбора нового CSS
+    style = label.style()
+    style.unpolish(label)
+    style.polish(label)
+
 def clear_download_history(self) -> None:
     """Очищает историю загрузок."""
     self.download_manager.reset_download_history()
@@ -439,10 +620,10 @@ def clear_download_history(self) -> None:
                          "История загрузок успешно очищена.")
 
 def cancel_download(self) -> None:
-    """Отменяет текущую загрузку."""
+    """Отменяет выполняющиеся загрузки."""
     self.download_manager.cancel_current_download()
     self.status_label.setText("Загрузка отменяется...")
-    self.status_label.setStyleSheet("color: orange;")
+    _set_status_state(self, "warn")
     self.progress_bar.setValue(0)
     self.progress_bar.setRange(0, 100)
 
@@ -450,14 +631,17 @@ def clear_queue(self) -> None:
     """Очищает очередь загрузок."""
     if not self.download_manager.download_queue:
         return
-    reply = QMessageBox.question(
-        self,
-        'Подтверждение',
-        'Очистить очередь загрузок?',
-        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-        QMessageBox.StandardButton.No
-    )
-    if reply == QMessageBox.StandardButton.Yes:
+    # Диалог подтверждения создается один раз и переиспользуется
+    if self._confirm_clear_queue is None:
+        self._confirm_clear_queue = QMessageBox(
+            QMessageBox.Icon.Question,
+            'Подтверждение',
+            'Очистить очередь загрузок?',
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            self
+        )
+        self._confirm_clear_queue.setDefaultButton(QMessageBox.StandardButton.No)
+    if self._confirm_clear_queue.exec() == QMessageBox.StandardButton.Yes:
         self.download_manager.clear_queue()
         self.update_queue_display()
         self.status_label.setText("Очередь очищена")
@@ -472,6 +656,18 @@ def remove_selected(self) -> None:
 
 def show_about_dialog(self, event) -> None:
     """Показывает диалоговое окно с информацией о программе."""
+    # Диалог с логотипом собирается один раз и переиспользуется при следующих открытиях
+    if self._about_dialog is None:
+        self._about_dialog = _build_about_dialog(self)
+    self._about_dialog.exec()
+
+def _build_about_dialog(self) -> QMessageBox:
+    """
+    Создает диалоговое окно с информацией о программе.
+    
+    Returns:
+        Настроенный QMessageBox
+    """
     success, _, image_path = load_app_logo((120, 120))
     
     # Создаем текст с HTML-форматированием
@@ -513,18 +709,112 @@ def show_about_dialog(self, event) -> None:
     if not success:
         msg_box.setIcon(QMessageBox.Icon.Information)
     
-    msg_box.exec()
+    return msg_box
 
 def show_url_report_dialog(self) -> None:
     """Показывает диалог для отправки сообщения о неизвестном формате URL."""
-    # Сокращенная версия для краткости
+    # Диалог создается один раз; при каждом открытии обновляется только его текст
+    if self._url_report_dialog is None:
+        self._url_report_dialog, self._url_report_send_btn = _build_url_report_dialog(self)
+    dialog = self._url_report_dialog
+
+    # Логи неизвестных URL читаются один раз: и для сводки, и для отправки
+    unknown_logs = _read_unknown_url_logs()
+    if unknown_logs:
+        log_text = "Найдены записи о неизвестных форматах URL:\n\n"
+        for log_file, count, _ in unknown_logs:
+            log_text += f"{log_file}: {count} записей\n"
+        dialog.setInformativeText(log_text + "\n\nХотите отправить эти данные разработчику?")
+        dialog.setDetailedText("Нажмите 'Отправить', чтобы скопировать логи в буфер обмена и открыть "
+                              "почтовый клиент. Вы можете вставить данные в письмо и отправить его разработчику.")
+    else:
+        dialog.setInformativeText("Не найдено записей о неизвестных форматах URL.\n\n"
+                                  "Если вы хотите сообщить о новом формате, скопируйте URL и отправьте его "
+                                  "разработчику на адрес: maks_k77@mail.ru")
+        dialog.setDetailedText("")
+    self._url_report_send_btn.setVisible(bool(unknown_logs))
+
+    dialog.exec()
+    if unknown_logs and dialog.clickedButton() is self._url_report_send_btn:
+        _send_url_report(self, unknown_logs)
+
+def _build_url_report_dialog(self) -> Tuple[QMessageBox, QPushButton]:
+    """
+    Создает диалог сообщения о неизвестном формате URL.
+    
+    Returns:
+        Кортеж (диалог, кнопка "Отправить")
+    """
     dialog = QMessageBox(self)
     dialog.setWindowTitle("Сообщить о новом формате URL")
     dialog.setIcon(QMessageBox.Icon.Information)
     dialog.setText("Если вы обнаружили URL видео, который не распознается программой, "
                   "вы можете отправить его разработчику для добавления поддержки.")
-    dialog.addButton(QMessageBox.StandardButton.Ok)
-    dialog.exec()
+    send_btn = dialog.addButton("Отправить", QMessageBox.ButtonRole.AcceptRole)
+    dialog.addButton(QMessageBox.StandardButton.Close)
+    return dialog, send_btn
+
+def _read_unknown_url_logs() -> List[Tuple[str, int, List[str]]]:
+    """
+    Читает логи неизвестных форматов URL за один проход по каждому файлу.
+    
+    Returns:
+        Список кортежей (имя файла, количество записей, последние 10 записей)
+    """
+    # Записи, накопленные в памяти валидатора, должны попасть в отчет
+    VideoURL.flush_unknown_url_logs()
+
+    # Один просмотр текущего каталога вместо проверки существования каждого файла
+    try:
+        with os.scandir('.') as entries:
+            log_files = sorted(entry.name for entry in entries if entry.name in _UNKNOWN_LOG_NAMES)
+    except OSError as e:
+        logger.error(f"Ошибка при поиске логов неизвестных URL: {e}")
+        return []
+
+    unknown_logs = []
+    for log_file in log_files:
+        try:
+            # В памяти держим только последние 10 строк, а не весь файл
+            tail = deque(maxlen=10)
+            count = 0
+            with open(log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    count += 1
+                    tail.append(line)
+        except Exception as e:
+            logger.error(f"Ошибка при чтении лога неизвестных URL: {e}")
+            continue
+        if count:
+            unknown_logs.append((log_file, count, list(tail)))
+    return unknown_logs
+
+def _send_url_report(self, unknown_logs: List[Tuple[str, int, List[str]]]) -> None:
+    """
+    Копирует отчет о неизвестных URL в буфер обмена и открывает почтовый клиент.
+    
+    Args:
+        unknown_logs: Результат _read_unknown_url_logs
+    """
+    # Подготавливаем текст для отправки
+    email_text = "Здравствуйте!\n\nЯ обнаружил следующие неподдерживаемые URL в Video Downloader:\n\n"
+    for log_file, _, tail in unknown_logs:
+        email_text += f"=== {log_file} ===\n"
+        email_text += "".join(tail)  # Только последние 10 записей
+        email_text += "\n"
+
+    # Копируем в буфер обмена
+    QApplication.clipboard().setText(email_text)
+
+    # Пытаемся открыть почтовый клиент
+    try:
+        webbrowser.open("mailto:maks_k77@mail.ru?subject=Video%20Downloader%20-%20New%20URL%20Format")
+        QMessageBox.information(self, "Отправка отчета",
+                              "Текст отчета скопирован в буфер обмена. Вставьте его в письмо.")
+    except Exception as e:
+        logger.error(f"Ошибка при открытии почтового клиента: {e}")
+        QMessageBox.information(self, "Отправка отчета",
+                              "Текст отчета скопирован в буфер обмена. Отправьте его на адрес: maks_k77@mail.ru")
 
 def set_controls_enabled(self, enabled: bool) -> None:
     """
@@ -551,33 +841,45 @@ def on_mode_changed(self) -> None:
     if is_video and self.url_input.text().strip():
         self.check_url_for_resolutions(self.url_input.text().strip())
 
+def showEvent(self, event) -> None:
+    """
+    Обработчик показа окна.
+    
+    При первом показе задает размеры панелей по ширине окна и
+    перерисовывает очередь, если она менялась, пока окно было скрыто.
+    """
+    if self._splitter_sizes_pending:
+        self._splitter_sizes_pending = False
+        width = self.width()
+        self.splitter.setSizes([int(width * 0.4), int(width * 0.6)])
+    QMainWindow.showEvent(self, event)
+    # Применяем изменения очереди, накопленные пока окно было скрыто
+    if self._queue_dirty:
+        _do_update_queue_display(self)
+
 def closeEvent(self, event):
     """Обработчик закрытия приложения."""
-    from downloader import video_info_cache
-    import logging
-    
-    logger = logging.getLogger('VideoDownloader')
     logger.info("Завершение работы приложения...")
     
     # Останавливаем активные потоки
-    if hasattr(self, 'resolution_worker') and self.resolution_worker is not None:
-        try:
-            logger.info("Остановка потока ResolutionWorker...")
-            self.resolution_worker.terminate()
-            self.resolution_worker.wait(2000)  # Ждем максимум 2 секунды
-        except Exception as e:
-            logger.error(f"Ошибка при остановке потока ResolutionWorker: {e}")
+    # Задача получения разрешений завершится сама и будет дождана вместе с пулом
+    if self.resolution_runnable is not None:
+        logger.info("Отмена получения разрешений...")
+        self.resolution_runnable.cancel()
+        self.resolution_runnable = None
             
-    # Отменяем текущую загрузку, если есть
-    if self.download_manager.current_download:
-        logger.info("Отмена текущей загрузки...")
+    # Отменяем выполняющиеся загрузки, если есть
+    if self.download_manager.active_downloads:
         self.download_manager.cancel_current_download()
         
     # Ждем завершения всех потоков в пуле
     self.thread_pool.waitForDone(3000)  # Ждем максимум 3 секунды
     
-    # Сохраняем кэш при выходе
-    video_info_cache.save_to_file()
+    # Кэши записываются в фоновом потоке, чтобы окно закрылось сразу;
+    # перед выходом приложение дожидается окончания записи
+    flush_thread = threading.Thread(target=_flush_caches, name="CacheFlush")
+    flush_thread.start()
+    QApplication.instance().aboutToQuit.connect(flush_thread.join)
     
     # Сохраняем настройки
     self.save_settings()
@@ -585,10 +887,17 @@ def closeEvent(self, event):
     logger.info("Приложение успешно завершено")
     event.accept()
 
+def _flush_caches() -> None:
+    """Сохраняет кэши на диск при завершении работы."""
+    # Записи кэша видео уже в журнале, его достаточно закрыть
+    video_info_cache.close()
+    resolution_cache.save_to_file()
+
 def clear_cache(self) -> None:
     """Очищает кэш информации о видео."""
-    from downloader import video_info_cache
     video_info_cache.clear()
     video_info_cache.save_to_file()
+    resolution_cache.clear()
+    resolution_cache.save_to_file()
     QMessageBox.information(self, "Кэш очищен", 
                          "Кэш информации о видео успешно очищен.") 
\ No newline at end of file
@@ -15,11 +15,13 @@ from PyQt6.QtWidgets import QApplication, QMessageBox
 from PyQt6.QtCore import Qt
 
 # Импортируем наши модули
-from utils import setup_logging, check_ffmpeg
+from utils import setup_logging, setup_crash_logging, check_ffmpeg
 # Импортируем обновленный интерфейс с темной темой
 from gui_dark import VideoDownloaderUI
 # Импортируем оптимизации
 from optimizations import optimize_for_large_files, performance_profiler
+# Кэши информации о видео и разрешений
+from downloader import video_info_cache, resolution_cache
 
 
 def show_error_dialog(error_type, error_value, error_tb):
@@ -55,9 +57,9 @@ def show_error_dialog(error_type, error_value, error_tb):
     
     # В любом случае записываем ошибку в файл crash.log
     try:
-        with open("crash.log", "a", encoding="utf-8") as f:
-            f.write(f"[{logging.Formatter().formatTime(None)}] {error_type}: {error_value}\n")
-            f.write(f"Детали:\n{error_details}\n\n")
+        logging.getLogger('VideoDownloader.crash').critical(
+            f"{error_type}: {error_value}\nДетали:\n{error_details}\n"
+        )
     except Exception as e:
         logger.critical(f"Не удалось записать информацию о сбое в файл: {e}")
 
@@ -71,7 +73,8 @@ def main():
     logger = setup_logging()
     logger.info("Запуск приложения Video Downloader")
     
-    # Устанавливаем обработчик исключений
+    # Устанавливаем обработчик исключений и файл для записи сбоев
+    setup_crash_logging()
     sys.excepthook = show_error_dialog
     
     # Создаем директорию для загрузок, если её нет
@@ -85,6 +88,10 @@ def main():
     optimize_for_large_files()
     logger.info("Оптимизации применены")
 
+    # Загружаем сохраненные кэши до создания окна, которое ими пользуется
+    video_info_cache.load_from_file()
+    resolution_cache.load_from_file()
+
     # Запускаем приложение
     app = QApplication(sys.argv)
     app.setApplicationName("Video Downloader")
@@ -6,6 +6,7 @@
 Содержит утилиты для мониторинга производительности и управления ресурсами.
 """
 
+import os
 import time
 import logging
 import threading
@@ -16,100 +17,210 @@ import gc
 
 logger = logging.getLogger('VideoDownloader')
 
+# Функция WinAPI для сброса рабочего набора процесса (только Windows)
+try:
+    if os.name == 'nt':
+        import ctypes
+        _SET_WORKING_SET_SIZE = ctypes.windll.kernel32.SetProcessWorkingSetSize
+    else:
+        _SET_WORKING_SET_SIZE = None
+except Exception:
+    _SET_WORKING_SET_SIZE = None
+
+
+class _FunctionStats:
+    """Накопленная статистика вызовов одной профилируемой функции."""
+
+    __slots__ = ('lock', 'calls', 'total_time', 'max_time', 'min_time', 'total_memory_delta', 'errors')
+
+    def __init__(self):
+        # Собственная блокировка записи: вызовы разных функций не конкурируют друг с другом
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.min_time = float('inf')
+        self.total_memory_delta = 0
+        self.errors = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Возвращает статистику в виде словаря; средние значения вычисляются при чтении."""
+        with self.lock:
+            calls = self.calls or 1
+            return {
+                'calls': self.calls,
+                'total_time': self.total_time,
+                'avg_time': self.total_time / calls,
+                'max_time': self.max_time,
+                'min_time': self.min_time,
+                'total_memory_delta': self.total_memory_delta,
+                'avg_memory_delta': self.total_memory_delta / calls,
+                'errors': self.errors
+            }
+
 
 class PerformanceProfiler:
     """Профайлер для измерения производительности функций."""
     
-    def __init__(self):
-        self.stats = {}
+    def __init__(self, max_entries: int = 512):
+        """
+        Инициализирует профайлер.
+
+        Args:
+            max_entries: Максимальное число функций, для которых хранится статистика
+        """
+        self.max_entries = max_entries
+        self.stats: Dict[str, _FunctionStats] = {}
+        # Сообщение о достижении лимита записей выводится один раз
+        self._limit_logged = False
+        # Нужна только при создании записи для новой функции и при сбросе статистики
         self.lock = threading.Lock()
+        # Дескриптор текущего процесса создается один раз
+        self._proc = psutil.Process()
     
-    def profile(self, func_name: str = None):
-        """Декоратор для профилирования функций."""
+    def profile(self, func_name: str = None, track_memory: bool = False):
+        """
+        Декоратор для профилирования функций.
+
+        Args:
+            func_name: Имя функции в статистике (по умолчанию модуль и имя функции)
+            track_memory: Измерять изменение RSS процесса; требует двух системных
+                вызовов на каждый вызов функции, поэтому по умолчанию отключено
+        """
         def decorator(func):
             name = func_name or f"{func.__module__}.{func.__name__}"
-            
-            @wraps(func)
-            def wrapper(*args, **kwargs):
-                start_time = time.time()
-                start_memory = psutil.Process().memory_info().rss
-                
-                try:
-                    result = func(*args, **kwargs)
-                    success = True
-                    error = None
-                except Exception as e:
-                    result = None
-                    success = False
-                    error = str(e)
-                    raise
-                finally:
-                    end_time = time.time()
-                    end_memory = psutil.Process().memory_info().rss
-                    
-                    execution_time = end_time - start_time
-                    memory_delta = end_memory - start_memory
-                    
-                    with self.lock:
-                        if name not in self.stats:
-                            self.stats[name] = {
-                                'calls': 0,
-                                'total_time': 0,
-                                'avg_time': 0,
-                                'max_time': 0,
-                                'min_time': float('inf'),
-                                'total_memory_delta': 0,
-                                'avg_memory_delta': 0,
-                                'errors': 0
-                            }
-                        
-                        stats = self.stats[name]
-                        stats['calls'] += 1
-                        stats['total_time'] += execution_time
-                        stats['avg_time'] = stats['total_time'] / stats['calls']
-                        stats['max_time'] = max(stats['max_time'], execution_time)
-                        stats['min_time'] = min(stats['min_time'], execution_time)
-                        stats['total_memory_delta'] += memory_delta
-                        stats['avg_memory_delta'] = stats['total_memory_delta'] / stats['calls']
-                        
-                        if not success:
-                            stats['errors'] += 1
-                        
-                        # Логируем медленные операции
-                        if execution_time > 1.0:  # Больше 1 секунды
-                            logger.warning(f"Медленная операция {name}: {execution_time:.2f}с")
-                
-                return result
-            return wrapper
+            # Обертка выбирается один раз, чтобы в каждом вызове не проверять флаги
+            if track_memory:
+                return _make_memory_wrapper(func, name, self)
+            return _make_time_only_wrapper(func, name, self)
         return decorator
     
+    def _record(self, name: str, execution_time: float, memory_delta: int, failed: bool) -> None:
+        """
+        Учитывает один вызов профилируемой функции.
+
+        Args:
+            name: Имя функции в статистике
+            execution_time: Время выполнения в секундах
+            memory_delta: Изменение RSS процесса в байтах
+            failed: Вызов завершился исключением
+        """
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self._create_stats(name)
+        
+        # Под блокировкой только обновляем накопители, средние считаются при чтении
+        if stats is not None:
+            with stats.lock:
+                stats.calls += 1
+                stats.total_time += execution_time
+                if execution_time > stats.max_time:
+                    stats.max_time = execution_time
+                if execution_time < stats.min_time:
+                    stats.min_time = execution_time
+                stats.total_memory_delta += memory_delta
+                if failed:
+                    stats.errors += 1
+        
+        # Логируем медленные операции
+        if execution_time > 1.0:  # Больше 1 секунды
+            logger.warning(f"Медленная операция {name}: {execution_time:.2f}с")
+    
+    def _create_stats(self, name: str) -> Optional[_FunctionStats]:
+        """
+        Создает запись статистики для функции при ее первом вызове.
+
+        Returns:
+            Запись статистики или None, если достигнут лимит max_entries
+        """
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                # После достижения лимита новые функции не учитываются; уже собранная
+                # статистика часто вызываемых функций при этом не теряется
+                if len(self.stats) >= self.max_entries:
+                    if not self._limit_logged:
+                        self._limit_logged = True
+                        logger.warning(
+                            f"Достигнут лимит статистики профайлера ({self.max_entries} функций), "
+                            f"новые функции не учитываются"
+                        )
+                    return None
+                stats = _FunctionStats()
+                # Новый словарь подменяется целиком, поэтому читатели всегда видят согласованный снимок
+                new_stats = dict(self.stats)
+                new_stats[name] = stats
+                self.stats = new_stats
+            return stats
+    
     def get_stats(self) -> Dict[str, Any]:
         """Возвращает статистику производительности."""
-        with self.lock:
-            return dict(self.stats)
+        # Общая блокировка не нужна: словарь записей никогда не изменяется на месте
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
     
     def reset_stats(self):
         """Сбрасывает статистику."""
         with self.lock:
-            self.stats.clear()
+            self.stats = {}
+            self._limit_logged = False
     
     def log_stats(self):
         """Логирует статистику производительности."""
-        with self.lock:
-            if not self.stats:
-                logger.info("Статистика производительности пуста")
-                return
-            
-            logger.info("=== Статистика производительности ===")
-            for name, stats in sorted(self.stats.items()):
-                logger.info(
-                    f"{name}: "
-                    f"вызовов={stats['calls']}, "
-                    f"среднее время={stats['avg_time']:.3f}с, "
-                    f"макс время={stats['max_time']:.3f}с, "
-                    f"средняя память={stats['avg_memory_delta']/(1024*1024):.1f}МБ, "
-                    f"ошибок={stats['errors']}"
-                )
+        all_stats = self.get_stats()
+        if not all_stats:
+            logger.info("Статистика производительности пуста")
+            return
+        
+        logger.info("=== Статистика производительности ===")
+        for name, stats in sorted(all_stats.items()):
+            logger.info(
+                f"{name}: "
+                f"вызовов={stats['calls']}, "
+                f"среднее время={stats['avg_time']:.3f}с, "
+                f"макс время={stats['max_time']:.3f}с, "
+                f"средняя память={stats['avg_memory_delta']/(1024*1024):.1f}МБ, "
+                f"ошибок={stats['errors']}"
+            )
+
+
+def _make_time_only_wrapper(func: Callable, name: str, profiler: PerformanceProfiler) -> Callable:
+    """Создает обертку, измеряющую только время выполнения функции."""
+    # Монотонный таймер высокого разрешения, связанный заранее для горячего пути
+    perf_counter = time.perf_counter
+    record = profiler._record
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        failed = True
+        start_time = perf_counter()
+        try:
+            result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            record(name, perf_counter() - start_time, 0, failed)
+    return wrapper
+
+
+def _make_memory_wrapper(func: Callable, name: str, profiler: PerformanceProfiler) -> Callable:
+    """Создает обертку, измеряющую время выполнения и изменение RSS процесса."""
+    perf_counter = time.perf_counter
+    memory_info = profiler._proc.memory_info
+    record = profiler._record
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        failed = True
+        start_memory = memory_info().rss
+        start_time = perf_counter()
+        try:
+            result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            execution_time = perf_counter() - start_time
+            record(name, execution_time, memory_info().rss - start_memory, failed)
+    return wrapper
 
 
 class ResourceManager:
@@ -126,11 +237,14 @@ class ResourceManager:
             'cpu_limit': [],
             'resource_warning': []
         }
+        # Защищает списки callback'ов: цикл мониторинга читает их из другого потока
+        self._callbacks_lock = threading.Lock()
     
     def add_callback(self, event_type: str, callback: Callable):
         """Добавляет callback для событий ресурсов."""
-        if event_type in self.callbacks:
-            self.callbacks[event_type].append(callback)
+        with self._callbacks_lock:
+            if event_type in self.callbacks:
+                self.callbacks[event_type].append(callback)
     
     def start_monitoring(self, interval: float = 5.0):
         """Запускает мониторинг ресурсов."""
@@ -157,11 +271,17 @@ class ResourceManager:
         """Основной цикл мониторинга."""
         while self.monitoring:
             try:
+                # Снимок callback'ов на текущую итерацию
+                with self._callbacks_lock:
+                    memory_callbacks = tuple(self.callbacks['memory_limit'])
+                    cpu_callbacks = tuple(self.callbacks['cpu_limit'])
+                    warning_callbacks = tuple(self.callbacks['resource_warning'])
+                
                 # Проверяем память
                 memory_usage = self.process.memory_info().rss
                 if memory_usage > self.max_memory_bytes:
                     logger.warning(f"Превышен лимит памяти: {memory_usage/(1024*1024):.1f}МБ")
-                    for callback in self.callbacks['memory_limit']:
+                    for callback in memory_callbacks:
                         try:
                             callback(memory_usage)
                         except Exception as e:
@@ -171,7 +291,7 @@ class ResourceManager:
                 cpu_percent = self.process.cpu_percent()
                 if cpu_percent > self.max_cpu_percent:
                     logger.warning(f"Превышен лимит CPU: {cpu_percent:.1f}%")
-                    for callback in self.callbacks['cpu_limit']:
+                    for callback in cpu_callbacks:
                         try:
                             callback(cpu_percent)
                         except Exception as e:
@@ -179,7 +299,7 @@ class ResourceManager:
                 
                 # Общие предупреждения о ресурсах
                 if memory_usage > self.max_memory_bytes * 0.8 or cpu_percent > self.max_cpu_percent * 0.8:
-                    for callback in self.callbacks['resource_warning']:
+                    for callback in warning_callbacks:
                         try:
                             callback({
                                 'memory_mb': memory_usage / (1024 * 1024),
@@ -212,17 +332,17 @@ class ResourceManager:
         """Принудительная очистка ресурсов."""
         logger.info("Принудительная очистка ресурсов...")
         
-        # Сборка мусора
-        collected = gc.collect()
+        # Сборка мусора в молодых поколениях: полный обход кучи слишком дорог
+        # для callback'а, который может срабатывать при каждой проверке памяти
+        collected = gc.collect(generation=1)
         logger.info(f"Собрано {collected} объектов сборщиком мусора")
         
         # Дополнительная очистка
-        try:
-            import ctypes
-            if hasattr(ctypes, 'windll'):  # Windows
-                ctypes.windll.kernel32.SetProcessWorkingSetSize(-1, -1, -1)
-        except Exception:
-            pass
+        if _SET_WORKING_SET_SIZE is not None:
+            try:
+                _SET_WORKING_SET_SIZE(-1, -1, -1)
+            except Exception:
+                pass
 
 
 # Глобальные экземпляры
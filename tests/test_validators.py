@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Тесты проверки URL видеосервисов (validators.VideoURL).
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from validators import VideoURL
+
+
+class VideoURLTestCase(unittest.TestCase):
+    """Проверки VideoURL на встроенных паттернах без файла конфигурации проекта."""
+
+    @classmethod
+    def setUpClass(cls):
+        # Файл конфигурации и логи нераспознанных URL пишутся во временный каталог
+        cls._old_cwd = os.getcwd()
+        cls._tmp_dir = tempfile.TemporaryDirectory()
+        os.chdir(cls._tmp_dir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        VideoURL.flush_unknown_url_logs()
+        os.chdir(cls._old_cwd)
+        cls._tmp_dir.cleanup()
+
+
+class IsValidAgreesWithTestUrlTest(VideoURLTestCase):
+    """is_valid и test_url должны одинаково оценивать один и тот же URL."""
+
+    URLS = [
+        'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+        'https://www.youtube.com/watch?v=dQw4w9WgXcQ\n',
+        'https://youtu.be/dQw4w9WgXcQ',
+        'https://music.youtube.com/watch?v=dQw4w9WgXcQ',
+        'https://www.youtube.com/foo',
+        'https://vk.com/video-1_2',
+        'https://vk.com/id1',
+        'https://rutube.ru/video/' + 'a' * 32 + '/',
+        'https://vm.tiktok.com/abc/',
+        'https://www.tiktok.com/@user/video/123',
+        'https://example.com/x',
+        'https://www.YouTube.com/watch?v=dQw4w9WgXcQ',
+        'https://youtube.com:443/watch?v=dQw4w9WgXcQ',
+        'https://user:pw@youtube.com/watch?v=dQw4w9WgXcQ',
+        'https://youtube.com:8080/watch?v=dQw4w9WgXcQ',
+    ]
+
+    def test_agreement(self):
+        for url in self.URLS:
+            with self.subTest(url=url):
+                self.assertEqual(VideoURL.is_valid(url)[0], VideoURL.test_url(url)['is_valid'])
+
+    def test_trailing_newline_matches_baseline(self):
+        # '$' в паттернах совпадает и перед завершающим переводом строки
+        self.assertTrue(VideoURL.is_valid('https://www.youtube.com/watch?v=dQw4w9WgXcQ\n')[0])
+
+
+class HostNormalizationTest(VideoURLTestCase):
+    """Регистр хоста, порт по умолчанию и данные пользователя не влияют на проверку."""
+
+    def test_equivalent_hosts_are_valid(self):
+        for url in ('https://www.YouTube.com/watch?v=dQw4w9WgXcQ',
+                    'https://youtube.com:443/watch?v=dQw4w9WgXcQ',
+                    'http://youtube.com:80/watch?v=dQw4w9WgXcQ',
+                    'https://user:pw@youtube.com/watch?v=dQw4w9WgXcQ'):
+            with self.subTest(url=url):
+                self.assertEqual(VideoURL.is_valid(url), (True, ""))
+                self.assertEqual(VideoURL.get_service_name(url), 'YouTube')
+                self.assertNotIn(url, VideoURL._unknown_seen)
+
+    def test_custom_port_is_not_reported_as_new_format(self):
+        url = 'https://youtube.com:8080/watch?v=dQw4w9WgXcQ'
+        self.assertFalse(VideoURL.is_valid(url)[0])
+        self.assertEqual(VideoURL.get_service_name(url), 'YouTube')
+        self.assertNotIn(url, VideoURL._unknown_seen)
+
+    def test_path_case_is_preserved(self):
+        self.assertFalse(VideoURL.is_valid('https://www.youtube.com/SHORTS/dQw4w9WgXcQ')[0])
+
+
+class UnknownFormatLoggingTest(VideoURLTestCase):
+    """Кэш результатов проверки не подавляет запись нераспознанных URL в лог."""
+
+    def test_logging_is_outside_cache(self):
+        url = 'https://www.youtube.com/unknown-format'
+        for check in (VideoURL.is_valid, VideoURL.get_service_name):
+            with self.subTest(check=check.__name__):
+                check(url)
+                self.assertIn(url, VideoURL._unknown_seen)
+                # Повторный вызов берет результат из кэша, но снова передает URL в лог
+                VideoURL._unknown_seen.discard(url)
+                check(url)
+                self.assertIn(url, VideoURL._unknown_seen)
+
+
+class UserPatternTest(VideoURLTestCase):
+    """Паттерны из файла конфигурации включаются в проверку без разбора их текста."""
+
+    USER_PATTERNS = [
+        # Вложенные группы
+        ('YouTube', r'^https?://(?:www\.)?youtube\.com/live/(?:(?:[\w-]{11}))(?:\?\S*)?$',
+         'https://www.youtube.com/live/dQw4w9WgXcQ?feature=share'),
+        # Символьный класс, содержащий '/'
+        ('YouTube', r'^https?://(?:www\.)?youtube\.com/attribution_link\?u=[\w/%.=&-]+$',
+         'https://youtube.com/attribution_link?u=/watch%3Fv%3DdQw4w9WgXcQ'),
+        # Экранированные скобки
+        ('YouTube', r'^https?://(?:www\.)?youtube\.com/v\(\d+\)$',
+         'https://www.youtube.com/v(42)'),
+        # Хост, которого нет в таблице доменов
+        ('VK', r'^https?://(?:www\.)?vk\.ru/video-?\d+_\d+$',
+         'https://vk.ru/video-1_2'),
+    ]
+
+    def setUp(self):
+        self._saved_patterns = {service: list(patterns) for service, patterns in VideoURL.URL_PATTERNS.items()}
+
+    def tearDown(self):
+        with VideoURL._init_lock:
+            VideoURL.URL_PATTERNS.clear()
+            VideoURL.URL_PATTERNS.update(self._saved_patterns)
+            VideoURL._rebuild_patterns()
+
+    def test_registered_patterns_match(self):
+        for service, pattern, url in self.USER_PATTERNS:
+            with self.subTest(pattern=pattern):
+                self.assertFalse(VideoURL.is_valid(url)[0])
+                self.assertTrue(VideoURL.register_url_pattern(service, pattern))
+                self.assertEqual(VideoURL.is_valid(url), (True, ""))
+                self.assertEqual(VideoURL.get_service_name(url), service)
+                self.assertEqual(VideoURL.test_url(url)['matched_pattern'], pattern)
+
+    def test_builtin_urls_unaffected(self):
+        for service, pattern, _ in self.USER_PATTERNS:
+            VideoURL.register_url_pattern(service, pattern)
+        self.assertTrue(VideoURL.is_valid('https://www.youtube.com/watch?v=dQw4w9WgXcQ')[0])
+        self.assertTrue(VideoURL.is_valid('https://vk.com/video-1_2')[0])
+        self.assertFalse(VideoURL.is_valid('https://www.youtube.com/v(x)')[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,20 +3,54 @@
 
 import os
 import sys
+import queue
+import atexit
 import logging
 from datetime import datetime
-from typing import Tuple, Optional
-from logging.handlers import RotatingFileHandler
-from PyQt6.QtGui import QPixmap
+from functools import lru_cache
+from typing import Dict, Tuple, Optional
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from PyQt6.QtGui import QPixmap, QPixmapCache
 from PyQt6.QtCore import Qt
 
+# Общий кэш масштабированных изображений Qt (лимит в КБ)
+QPixmapCache.setCacheLimit(10240)
+
+# Каталог ресурсов: временная директория PyInstaller (_MEIPASS) или каталог модуля
+_BASE_PATH = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+
+# Найденные пути изображений по имени без расширения ("" — файл не найден);
+# ресурсы поставляются с приложением и не меняются во время работы
+_resolved_image_paths: Dict[str, str] = {}
+
+
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler, который проверяет необходимость ротации не на каждой
+    записи, а раз в ROLLOVER_CHECK_INTERVAL записей.
+    """
+    
+    ROLLOVER_CHECK_INTERVAL = 64
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._emit_count = 0
+    
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """Проверяет размер файла только на каждой ROLLOVER_CHECK_INTERVAL-й записи."""
+        self._emit_count += 1
+        if self._emit_count % self.ROLLOVER_CHECK_INTERVAL:
+            return False
+        return super().shouldRollover(record)
+
 
 def setup_logging():
     """
     Настраивает систему логирования приложения.
     
     Создает директорию для логов, настраивает форматирование
-    и ротацию файлов логов.
+    и ротацию файлов логов. Запись в файл и консоль выполняется
+    в фоновом потоке, вызывающий код только кладет запись в очередь.
     """
     log_dir = "logs"
     os.makedirs(log_dir, exist_ok=True)
@@ -30,8 +64,8 @@ def setup_logging():
     if logger.handlers:
         return logger
     
-    # Настраиваем файловый обработчик с ротацией
-    file_handler = RotatingFileHandler(
+    # Настраиваем файловый обработчик с ротацией; размер файла проверяется пакетно
+    file_handler = BatchedRotatingFileHandler(
         filename=log_file,
         maxBytes=5*1024*1024,  # 5MB
         backupCount=3,
@@ -40,18 +74,48 @@ def setup_logging():
     file_handler.setFormatter(logging.Formatter(
         '%(asctime)s [%(levelname)s] %(funcName)s(%(lineno)d): %(message)s'
     ))
-    logger.addHandler(file_handler)
     
     # Добавляем обработчик для вывода в консоль
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(logging.Formatter(
         '%(asctime)s [%(levelname)s] %(funcName)s(%(lineno)d): %(message)s'
     ))
-    logger.addHandler(console_handler)
+    
+    # Логгер только ставит записи в очередь, обработчики работают в потоке QueueListener
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    # Храним ссылку на listener и дописываем очередь при завершении процесса
+    logger._queue_listener = listener
+    atexit.register(listener.stop)
     
     return logger
 
 
+def setup_crash_logging() -> logging.Logger:
+    """
+    Настраивает отдельный логгер для записи сбоев в файл crash.log.
+    
+    Файл открывается при первой записи; сообщения не дублируются
+    в основной лог приложения.
+    
+    Returns:
+        Логгер сбоев
+    """
+    crash_logger = logging.getLogger('VideoDownloader.crash')
+    if crash_logger.handlers:
+        return crash_logger
+    
+    crash_handler = logging.FileHandler("crash.log", encoding='utf-8', delay=True)
+    crash_handler.setFormatter(logging.Formatter('[%(asctime)s] %(message)s', '%Y-%m-%d %H:%M:%S'))
+    crash_logger.addHandler(crash_handler)
+    crash_logger.propagate = False
+    
+    return crash_logger
+
+
+@lru_cache(maxsize=256)
 def get_resource_path(relative_path: str) -> str:
     """
     Получает абсолютный путь к ресурсу, корректно работает как в режиме разработки,
@@ -63,13 +127,7 @@ def get_resource_path(relative_path: str) -> str:
     Returns:
         Абсолютный путь к ресурсу
     """
-    try:
-        # PyInstaller создает временную директорию и сохраняет путь в _MEIPASS
-        base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
-        return os.path.join(base_path, relative_path)
-    except Exception as e:
-        logging.getLogger('VideoDownloader').error(f"Ошибка при определении пути ресурса {relative_path}: {e}")
-        return os.path.join(os.path.dirname(os.path.abspath(__file__)), relative_path)
+    return os.path.join(_BASE_PATH, relative_path)
 
 
 def load_image(image_name: str, size: Tuple[int, int] = (100, 100)) -> Tuple[bool, Optional[QPixmap], str]:
@@ -84,30 +142,44 @@ def load_image(image_name: str, size: Tuple[int, int] = (100, 100)) -> Tuple[boo
         Tuple из (успех загрузки, pixmap или None, путь к файлу)
     """
     logger = logging.getLogger('VideoDownloader')
+    image_path = _resolved_image_paths.get(image_name)
+    if image_path is None:
+        image_path = _resolve_image_path(image_name)
+        _resolved_image_paths[image_name] = image_path
+    
+    if image_path:
+        try:
+            # Масштабируем изображение до указанного размера
+            scaled_pixmap = _load_scaled_pixmap(image_path, size)
+            if scaled_pixmap is not None:
+                return True, scaled_pixmap, image_path
+            else:
+                logger.warning(f"Изображение не удалось загрузить (пустой pixmap): {image_path}")
+        except Exception as e:
+            logger.exception(f"Ошибка при загрузке изображения {image_path}")
+    else:
+        logger.warning(f"Изображение {image_name} не найдено ни с одним из поддерживаемых расширений")
+    return False, None, ""
+
+
+def _resolve_image_path(image_name: str) -> str:
+    """
+    Находит файл изображения, перебирая поддерживаемые расширения.
+    
+    Args:
+        image_name: Имя файла без расширения
+        
+    Returns:
+        Путь к первому найденному файлу или пустая строка
+    """
     # Изменяем порядок расширений, чтобы PNG был первым
     extensions = [".png", ".jpeg", ".jpg", ".gif", ".ico"]
     
     for ext in extensions:
         image_path = get_resource_path(f"{image_name}{ext}")
         if os.path.exists(image_path):
-            try:
-                pixmap = QPixmap(image_path)
-                if not pixmap.isNull():
-                    # Масштабируем изображение до указанного размера
-                    scaled_pixmap = pixmap.scaled(
-                        size[0], size[1], 
-                        Qt.AspectRatioMode.KeepAspectRatio, 
-                        Qt.TransformationMode.SmoothTransformation
-                    )
-                    logger.info(f"Изображение успешно загружено: {image_path}")
-                    return True, scaled_pixmap, image_path
-                else:
-                    logger.warning(f"Изображение не удалось загрузить (пустой pixmap): {image_path}")
-            except Exception as e:
-                logger.exception(f"Ошибка при загрузке изображения {image_path}")
-    
-    logger.warning(f"Изображение {image_name} не найдено ни с одним из поддерживаемых расширений")
-    return False, None, ""
+            return image_path
+    return ""
 
 
 def load_app_logo(size: Tuple[int, int] = (80, 80), for_app_icon: bool = False) -> Tuple[bool, Optional[QPixmap], str]:
@@ -123,18 +195,11 @@ def load_app_logo(size: Tuple[int, int] = (80, 80), for_app_icon: bool = False)
     """
     logger = logging.getLogger('VideoDownloader')
     image_path = get_resource_path("vid1.png")
-    logger.info(f"Загрузка логотипа из: {image_path}")
     
     if os.path.exists(image_path):
         try:
-            pixmap = QPixmap(image_path)
-            if not pixmap.isNull():
-                scaled_pixmap = pixmap.scaled(
-                    size[0], size[1], 
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                )
-                logger.info(f"Логотип успешно загружен: {image_path}")
+            scaled_pixmap = _load_scaled_pixmap(image_path, size)
+            if scaled_pixmap is not None:
                 return True, scaled_pixmap, image_path
             else:
                 logger.warning(f"Логотип не удалось загрузить (пустой pixmap): {image_path}")
@@ -146,10 +211,45 @@ def load_app_logo(size: Tuple[int, int] = (80, 80), for_app_icon: bool = False)
     return False, None, ""
 
 
+def _load_scaled_pixmap(image_path: str, size: Tuple[int, int]) -> Optional[QPixmap]:
+    """
+    Возвращает масштабированное изображение из QPixmapCache или загружает его с диска.
+    
+    Args:
+        image_path: Путь к файлу изображения
+        size: Размер для масштабирования (ширина, высота)
+        
+    Returns:
+        Масштабированный pixmap или None, если изображение не удалось загрузить
+    """
+    key = f"{image_path}|{size[0]}x{size[1]}"
+    cached = QPixmapCache.find(key)
+    if cached is not None and not cached.isNull():
+        return cached
+    
+    pixmap = QPixmap(image_path)
+    if pixmap.isNull():
+        return None
+    scaled_pixmap = pixmap.scaled(
+        size[0], size[1],
+        Qt.AspectRatioMode.KeepAspectRatio,
+        Qt.TransformationMode.SmoothTransformation
+    )
+    QPixmapCache.insert(key, scaled_pixmap)
+    logger = logging.getLogger('VideoDownloader')
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Изображение загружено: %s (%dx%d)", image_path, size[0], size[1])
+    return scaled_pixmap
+
+
+@lru_cache(maxsize=1)
 def check_ffmpeg() -> bool:
     """
     Проверяет наличие ffmpeg и ffprobe в системе.
     
+    Результат кэшируется на время работы приложения; для повторной
+    проверки (например, после установки ffmpeg) вызовите check_ffmpeg.cache_clear().
+    
     Returns:
         True, если оба компонента найдены, иначе False.
     """
@@ -5,144 +5,65 @@ import re
 import os
 import json
 import logging
+import atexit
+import threading
 from datetime import datetime
-from typing import Tuple, Dict, Any, List, Set
+from typing import Tuple, Dict, Any, List, Optional, Set
 from functools import lru_cache
-from collections import defaultdict
-import time
+from collections import defaultdict, deque
+from urllib.parse import urlsplit
 
 logger = logging.getLogger('VideoDownloader')
 
+# Хост URL: необязательная схема, '//', необязательные данные пользователя и имя
+# хоста до порта, пути, запроса или фрагмента; результат совпадает с urlsplit().hostname
+_HOST_RE = re.compile(r'(?:[a-z][a-z0-9+.-]*:)?//(?:[^/?#]*@)?([^/?#:@\[\]]*)(?=[:/?#]|$)', re.IGNORECASE)
+
+# Схема и authority URL: схема, необязательные данные пользователя, хост и порт
+_AUTHORITY_RE = re.compile(r'([a-z][a-z0-9+.-]*)://(?:[^/?#]*@)?([^/?#:@\[\]]*)(?::(\d*))?(?=[/?#]|$)', re.IGNORECASE)
+_DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+# Обратные ссылки в тексте паттерна: они ломают общее выражение всех сервисов
+_BACKREFERENCE_RE = re.compile(r'(?<!\\)(?:\\\\)*\\[1-9]|\(\?P=')
+
 # Импортируем профайлер (с отложенным импортом для избежания циклических зависимостей)
 try:
     from optimizations import performance_profiler
 except ImportError:
     # Заглушка если модуль оптимизации недоступен
     class DummyProfiler:
-        def profile(self, name=None):
+        def profile(self, name=None, track_memory=False):
             def decorator(func):
                 return func
             return decorator
     performance_profiler = DummyProfiler()
 
+# Необязательный движок RE2 (пакет google-re2): время проверки линейно по длине URL
+try:
+    import re2
+except ImportError:
+    re2 = None
+
 class URLValidationError(Exception):
     """Ошибка валидации URL"""
     pass
 
 
-class DomainTrie:
-    """Trie-структура для быстрого поиска доменов."""
-
-    def __init__(self):
-        self.root = {}
-        self.services = {}
-
-    def add_domain(self, domain: str, service: str):
-        """Добавляет домен в trie."""
-        # Разбиваем домен на части (в обратном порядке для эффективного поиска)
-        parts = domain.split('.')[::-1]
-        node = self.root
-
-        for part in parts:
-            if part not in node:
-                node[part] = {}
-            node = node[part]
-
-        # Помечаем конец домена
-        node['_service'] = service
-
-    def find_service(self, url: str) -> str:
-        """Находит сервис по URL."""
-        try:
-            # Извлекаем домен из URL
-            if '://' in url:
-                domain = url.split('://')[1].split('/')[0]
-            else:
-                domain = url.split('/')[0]
-
-            # Убираем www. если есть
-            if domain.startswith('www.'):
-                domain = domain[4:]
-
-            # Ищем в trie
-            parts = domain.split('.')[::-1]
-            node = self.root
-
-            for part in parts:
-                if part in node:
-                    node = node[part]
-                    if '_service' in node:
-                        return node['_service']
-                else:
-                    break
-
-            return 'Неизвестный сервис'
-        except Exception:
-            return 'Неизвестный сервис'
-
-
-class ServiceCache:
-    """Кэш для результатов определения сервиса с TTL."""
+# Готовые результаты проверки URL: is_valid возвращает их без создания новых кортежей
+_RESULT_OK = (True, "")
+_RESULT_EMPTY = (False, "URL не может быть пустым")
+_RESULT_TOO_LONG = (False, "URL слишком длинный")
+_RESULT_BAD_SCHEME = (False, "URL должен начинаться с http:// или https://")
+_RESULT_UNSUPPORTED = (False, "Неподдерживаемый видеосервис или неверный формат URL")
 
-    def __init__(self, max_size: int = 1000, ttl: int = 3600):
-        self.cache = {}
-        self.timestamps = {}
-        self.max_size = max_size
-        self.ttl = ttl  # время жизни в секундах
 
-    def get(self, url: str) -> str:
-        """Получает сервис из кэша."""
-        current_time = time.time()
-
-        if url in self.cache:
-            # Проверяем TTL
-            if current_time - self.timestamps[url] < self.ttl:
-                return self.cache[url]
-            else:
-                # Удаляем устаревшую запись
-                del self.cache[url]
-                del self.timestamps[url]
-
-        return None
-
-    def set(self, url: str, service: str):
-        """Добавляет сервис в кэш."""
-        current_time = time.time()
-
-        # Если кэш полон, удаляем самые старые записи
-        if len(self.cache) >= self.max_size:
-            self._cleanup_old_entries()
-
-        self.cache[url] = service
-        self.timestamps[url] = current_time
-
-    def _cleanup_old_entries(self):
-        """Удаляет старые записи из кэша."""
-        current_time = time.time()
-        expired_keys = []
-
-        for url, timestamp in self.timestamps.items():
-            if current_time - timestamp >= self.ttl:
-                expired_keys.append(url)
-
-        # Удаляем устаревшие записи
-        for key in expired_keys:
-            del self.cache[key]
-            del self.timestamps[key]
-
-        # Если все еще полон, удаляем самые старые
-        if len(self.cache) >= self.max_size:
-            sorted_items = sorted(self.timestamps.items(), key=lambda x: x[1])
-            to_remove = len(sorted_items) - self.max_size + 100  # Удаляем с запасом
-
-            for url, _ in sorted_items[:to_remove]:
-                del self.cache[url]
-                del self.timestamps[url]
-
-    def clear(self):
-        """Очищает кэш."""
-        self.cache.clear()
-        self.timestamps.clear()
+@lru_cache(maxsize=32)
+def _bad_format_result(service: str) -> Tuple[bool, str]:
+    """Возвращает результат проверки для URL известного сервиса в неизвестном формате."""
+    return (
+        False,
+        f"Неверный формат URL для {service}. Проверьте правильность ссылки или сообщите разработчику о новом формате."
+    )
 
 
 class VideoURL:
@@ -150,6 +71,8 @@ class VideoURL:
     
     # Путь к файлу конфигурации паттернов URL
     CONFIG_FILE = "url_patterns.json"
+    # Время изменения файла конфигурации, содержимое которого уже объединено с URL_PATTERNS
+    _config_mtime = None
     
     # Константы с паттернами URL для разных сервисов
     URL_PATTERNS = {
@@ -171,10 +94,11 @@ class VideoURL:
             r'^https?://(?:www\.)?vkvideo\.ru/video-?\d+_\d+(?:\?\S*)?$',
             r'^https?://(?:www\.)?vk\.com/(?:video|clip)-?\d+(?:_\d+)?(?:\?\S*)?$',
             r'^https?://(?:www\.)?vk\.com/videos-?\d+(?:\?\S*)?$',
-            r'^https?://(?:www\.)?vk\.com/\S+$',
             r'^https?://(?:www\.)?vk\.com/clips-?\d+(?:\?\S*)?$',
             r'^https?://(?:m\.)?vk\.com/video(?:_ext)?\.php\?.*oid=(?:-?\d+).*id=\d+.*$',
-            r'^https?://(?:www\.)?vk\.com/video_ext\.php\?.*oid=(?:-?\d+).*id=\d+.*$'
+            r'^https?://(?:www\.)?vk\.com/video_ext\.php\?.*oid=(?:-?\d+).*id=\d+.*$',
+            # Любая другая страница vk.com: проверяется после конкретных форматов
+            r'^https?://(?:www\.)?vk\.com/\S+$'
         ],
         # Добавим еще несколько сервисов (для краткости)
         'RuTube': [
@@ -187,73 +111,279 @@ class VideoURL:
         ],
     }
     
-    # Объединенные регулярные выражения для быстрой проверки
-    _combined_patterns = {}
+    # Скомпилированные объединенные регулярные выражения для быстрой проверки
     _compiled_patterns = {}
     _patterns_loaded = False
+    # Защищает ленивую инициализацию и изменение паттернов от одновременного вызова
+    # из GUI и рабочих потоков; повторно входимая, так как перестроение выполняется
+    # из загрузки конфигурации, которая сама вызывается при инициализации
+    _init_lock = threading.RLock()
+    # Порядок сервисов в общем выражении: альтернативы проверяются слева направо,
+    # поэтому самые частые сервисы идут первыми; остальные следуют за ними
+    _service_order = ['YouTube', 'VK', 'TikTok', 'RuTube']
+    # Отдельно скомпилированные паттерны для test_url: сервис -> [(паттерн, выражение)];
+    # заполняется по требованию и сбрасывается при перестроении
+    _individual_compiled: Dict[str, List[Tuple[str, re.Pattern]]] = {}
+    # Общее выражение для всех сервисов: имя совпавшей группы -> сервис
+    _master_pattern = None
+    _master_groups = {}
 
     # Оптимизированные структуры данных
-    _domain_trie = DomainTrie()
-    _service_cache = ServiceCache(max_size=1000, ttl=3600)
-    _trie_initialized = False
+    # Домен (без www.) -> сервис
+    _domain_map = {}
+    # Максимальная длина URL, которую имеет смысл проверять
+    MAX_URL_LENGTH = 2048
+
+    # Буфер записей о нераспознанных URL: сервис -> строки лога
+    _unknown_log_buffer: Dict[str, List[str]] = defaultdict(list)
+    _unknown_log_lock = threading.Lock()
+    # Число накопленных записей, после которого буфер сбрасывается на диск
+    UNKNOWN_LOG_FLUSH_THRESHOLD = 64
+    _unknown_log_pending = 0
+    # Уже записанные URL: повторно не логируются; старые вытесняются первыми
+    UNKNOWN_LOG_SEEN_LIMIT = 10000
+    _unknown_seen: Set[str] = set()
+    _unknown_seen_order: deque = deque()
     
     @classmethod
-    def _init_combined_patterns(cls):
-        """Инициализирует объединенные регулярные выражения для быстрой проверки."""
-        if not cls._combined_patterns:
-            for service, patterns in cls.URL_PATTERNS.items():
-                # Объединяем все паттерны для сервиса через '|'
-                combined = '|'.join(f'(?:{pattern})' for pattern in patterns)
-                cls._combined_patterns[service] = combined
-                try:
-                    cls._compiled_patterns[service] = re.compile(combined)
-                    logger.info(f"Скомпилирован объединенный паттерн для {service}")
-                except re.error:
-                    logger.warning(f"Ошибка при компиляции объединенного паттерна для {service}")
-                    # Если не удалось скомпилировать объединенный паттерн,
-                    # компилируем отдельные паттерны
-                    cls._compiled_patterns[service] = [
-                        (pattern, re.compile(pattern)) 
-                        for pattern in patterns
-                    ]
-            logger.info("Объединенные регулярные выражения инициализированы")
+    def _ensure_initialized(cls):
+        """Загружает паттерны и строит структуры поиска при первом обращении."""
+        if cls._patterns_loaded:
+            return
+        with cls._init_lock:
+            if cls._patterns_loaded:
+                return
+            cls.load_patterns_from_config()
+            cls._init_combined_patterns()
+            cls._init_domain_map()
+            cls._patterns_loaded = True
+
+    @classmethod
+    def _rebuild_patterns(cls, changed_services: Optional[Set[str]] = None):
+        """
+        Перестраивает структуры поиска после изменения URL_PATTERNS и сбрасывает
+        кэши результатов. Параллельные проверки продолжают пользоваться прежними
+        структурами, пока новые не будут готовы.
+
+        Args:
+            changed_services: Сервисы, паттерны которых изменились; выражения
+                остальных сервисов используются повторно. None - перестроить все
+        """
+        with cls._init_lock:
+            # До первой инициализации строить нечего: это сделает _ensure_initialized
+            if not cls._patterns_loaded:
+                return
+            cls._init_combined_patterns(changed_services)
+            cls._init_domain_map()
+            cls._classify_url.cache_clear()
+            cls._lookup_service.cache_clear()
+            cls._check_url.cache_clear()
 
     @classmethod
-    def _init_domain_trie(cls):
-        """Инициализирует trie-структуру для быстрого поиска доменов."""
-        if not cls._trie_initialized:
-            domain_map = {
-                'youtube.com': 'YouTube',
-                'youtu.be': 'YouTube',
-                'music.youtube.com': 'YouTube',
-                'vk.com': 'VK',
-                'vkvideo.ru': 'VK',
-                'rutube.ru': 'RuTube',
-                'ok.ru': 'Одноклассники',
-                'mail.ru': 'Mail.ru',
-                'my.mail.ru': 'Mail.ru',
-                'bilibili.com': 'Bilibili',
-                'b23.tv': 'Bilibili',
-                'tiktok.com': 'TikTok',
-                'vm.tiktok.com': 'TikTok',
-                'vt.tiktok.com': 'TikTok',
-                'twitch.tv': 'Twitch',
-                'clips.twitch.tv': 'Twitch',
-                'vimeo.com': 'Vimeo',
-                'player.vimeo.com': 'Vimeo',
-                'facebook.com': 'Facebook',
-                'fb.watch': 'Facebook',
-                'instagram.com': 'Instagram',
-                't.me': 'Telegram',
-                'dailymotion.com': 'Dailymotion',
-                'coub.com': 'Coub'
+    def _init_combined_patterns(cls, changed_services: Optional[Set[str]] = None):
+        """
+        Инициализирует объединенные регулярные выражения для быстрой проверки.
+        Вызывается под _init_lock; готовые выражения подменяют прежние целиком.
+
+        Args:
+            changed_services: Если задано, заново компилируются только выражения
+                этих сервисов и общее выражение; None - компилируются все
+        """
+        reusable = {}
+        if changed_services is not None:
+            reusable = {
+                service: compiled for service, compiled in cls._compiled_patterns.items()
+                if service not in changed_services
             }
+        # Исходные строки нужны только для компиляции и общего выражения
+        combined_patterns = {}
+        compiled_patterns = {}
+        # Все паттерны уже проверены при загрузке, поэтому объединенное
+        # выражение каждого сервиса компилируется без запасного пути
+        for service, patterns in cls.URL_PATTERNS.items():
+            # Объединяем все паттерны для сервиса в одно выражение
+            combined = '|'.join(f'(?:{pattern})' for pattern in patterns)
+            combined_patterns[service] = combined
+            compiled = reusable.get(service)
+            compiled_patterns[service] = compiled if compiled is not None else _compile_pattern(combined)
+        cls._init_master_pattern(combined_patterns)
+        cls._compiled_patterns = compiled_patterns
+        cls._individual_compiled = {}
+        logger.info("Объединенные регулярные выражения инициализированы")
+
+    @classmethod
+    def _validate_pattern(cls, pattern: str) -> None:
+        """
+        Проверяет, что паттерн можно включить в общее выражение всех сервисов.
+
+        Raises:
+            re.error: Паттерн некорректен или содержит именованные группы и обратные ссылки
+        """
+        compiled = re.compile(pattern)
+        if compiled.groupindex or _BACKREFERENCE_RE.search(pattern):
+            raise re.error("именованные группы и обратные ссылки не поддерживаются")
+
+    @classmethod
+    def _is_usable_pattern(cls, service: str, pattern: str) -> bool:
+        """
+        Проверяет паттерн из файла конфигурации; некорректный паттерн пропускается,
+        чтобы он не сломал объединенное выражение всего сервиса.
+        """
+        try:
+            cls._validate_pattern(pattern)
+            return True
+        except re.error as e:
+            logger.warning(f"Пропущен некорректный паттерн для {service}: {pattern} ({e})")
+            return False
+
+    @classmethod
+    def _init_master_pattern(cls, combined_patterns: Dict[str, str]):
+        """
+        Компилирует одно выражение со всеми сервисами в именованных группах,
+        чтобы сервис определялся за один проход регулярного выражения.
+
+        Args:
+            combined_patterns: Объединенный паттерн каждого сервиса в виде строки
+        """
+        ordered_services = [service for service in cls._service_order if service in combined_patterns]
+        ordered_services += [service for service in combined_patterns if service not in cls._service_order]
+        # Имена сервисов не обязаны быть допустимыми именами групп, поэтому используем индексы
+        groups = {f"s{i}": service for i, service in enumerate(ordered_services)}
+        # Паттерны без собственных групп и обратных ссылок проверены при загрузке,
+        # поэтому общее выражение всегда компилируется
+        cls._master_pattern = _compile_pattern('|'.join(
+            f'(?P<{group}>{combined_patterns[service]})' for group, service in groups.items()
+        ))
+        cls._master_groups = groups
+
+    @classmethod
+    def _match_service(cls, url: str) -> Optional[str]:
+        """
+        Находит сервис, паттерну которого соответствует URL.
 
-            for domain, service in domain_map.items():
-                cls._domain_trie.add_domain(domain, service)
+        Returns:
+            Название сервиса или None, если ни один паттерн не совпал
+        """
+        # Один вызов регулярного выражения определяет и валидность, и сервис
+        match = cls._master_pattern.match(url)
+        return cls._master_groups[match.lastgroup] if match else None
 
-            cls._trie_initialized = True
-            logger.info("Trie-структура доменов инициализирована")
+    @classmethod
+    def _matches_service(cls, service: str, url: str) -> bool:
+        """Проверяет URL по паттернам одного сервиса."""
+        compiled_pattern = cls._compiled_patterns.get(service)
+        if compiled_pattern is None:
+            return False
+        try:
+            return compiled_pattern.match(url) is not None
+        except Exception as e:
+            logger.warning(f"Ошибка при проверке URL для {service}: {e}")
+            return False
+
+    @classmethod
+    def _init_domain_map(cls):
+        """
+        Инициализирует таблицу доменов для быстрого поиска сервиса.
+        Таблица собирается целиком и только затем подменяет прежнюю.
+        """
+        domain_map = {
+            'youtube.com': 'YouTube',
+            'youtu.be': 'YouTube',
+            'music.youtube.com': 'YouTube',
+            'vk.com': 'VK',
+            'vkvideo.ru': 'VK',
+            'rutube.ru': 'RuTube',
+            'ok.ru': 'Одноклассники',
+            'mail.ru': 'Mail.ru',
+            'my.mail.ru': 'Mail.ru',
+            'bilibili.com': 'Bilibili',
+            'b23.tv': 'Bilibili',
+            'tiktok.com': 'TikTok',
+            'vm.tiktok.com': 'TikTok',
+            'vt.tiktok.com': 'TikTok',
+            'twitch.tv': 'Twitch',
+            'clips.twitch.tv': 'Twitch',
+            'vimeo.com': 'Vimeo',
+            'player.vimeo.com': 'Vimeo',
+            'facebook.com': 'Facebook',
+            'fb.watch': 'Facebook',
+            'instagram.com': 'Instagram',
+            't.me': 'Telegram',
+            'dailymotion.com': 'Dailymotion',
+            'coub.com': 'Coub'
+        }
+        cls._domain_map = domain_map
+        logger.info("Таблица доменов инициализирована")
+
+    @staticmethod
+    def _host(url: str) -> str:
+        """
+        Извлекает хост URL без порта и префикса www. в нижнем регистре.
+
+        Returns:
+            Хост или пустая строка, если его не удалось разобрать
+        """
+        # URL без схемы дополняем '//', чтобы домен разбирался как netloc
+        if '://' not in url:
+            url = f'//{url}'
+        # Обычный случай разбирается одним скомпилированным выражением;
+        # urlsplit нужен только для необычных адресов (например, IPv6)
+        match = _HOST_RE.match(url)
+        if match is not None:
+            host = match.group(1).lower()
+        else:
+            try:
+                host = urlsplit(url).hostname or ''
+            except ValueError:
+                return ''
+        return host.removeprefix('www.')
+
+    @staticmethod
+    def _canonical_url(url: str) -> Tuple[str, bool]:
+        """
+        Приводит схему и хост URL к виду, на который рассчитаны паттерны.
+
+        Схема и хост переводятся в нижний регистр, данные пользователя и порт
+        по умолчанию отбрасываются, как и при определении сервиса по домену;
+        путь и параметры запроса не меняются.
+
+        Returns:
+            Кортеж (URL для сопоставления с паттернами, True если порта в нем не осталось)
+        """
+        match = _AUTHORITY_RE.match(url)
+        if match is None:
+            return url, True
+        scheme, host, port = match.groups()
+        scheme = scheme.lower()
+        if port == '' or port == _DEFAULT_PORTS.get(scheme):
+            port = None
+        authority = f'{host.lower()}:{port}' if port else host.lower()
+        return f'{scheme}://{authority}{url[match.end():]}', port is None
+
+    @classmethod
+    def _find_service_by_domain(cls, url: str) -> str:
+        """
+        Определяет сервис по домену URL.
+
+        Поддомены сводятся к известному домену отбрасыванием первой метки,
+        например music.youtube.com -> youtube.com.
+        """
+        try:
+            domain = cls._host(url)
+            domain_map = cls._domain_map
+            # Не больше одного обращения к словарю на метку хоста; срезы вместо split()
+            # не создают промежуточных списков
+            start = 0
+            while True:
+                service = domain_map.get(domain[start:])
+                if service is not None:
+                    return service
+                dot = domain.find('.', start)
+                if dot < 0:
+                    return 'Неизвестный сервис'
+                start = dot + 1
+        except Exception:
+            return 'Неизвестный сервис'
 
     @classmethod
     def load_patterns_from_config(cls) -> bool:
@@ -262,24 +392,40 @@ class VideoURL:
         Возвращает True в случае успешной загрузки, иначе False.
         """
         try:
-            if os.path.exists(cls.CONFIG_FILE):
-                with open(cls.CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    patterns = json.load(f)
-                    # Обновляем только существующие сервисы, новые не добавляем
-                    for service, service_patterns in patterns.items():
-                        if service in cls.URL_PATTERNS:
-                            # Добавляем только новые паттерны
-                            existing_patterns = set(cls.URL_PATTERNS[service])
-                            for pattern in service_patterns:
-                                if pattern not in existing_patterns:
-                                    cls.URL_PATTERNS[service].append(pattern)
-                    logger.info("Паттерны URL успешно загружены из конфигурации")
-                    return True
-            else:
+            try:
+                mtime = os.stat(cls.CONFIG_FILE).st_mtime_ns
+            except FileNotFoundError:
                 # Создаем файл конфигурации при первом запуске
                 logger.info(f"Файл конфигурации URL-паттернов не найден, создаем новый: {cls.CONFIG_FILE}")
                 cls.save_patterns_to_config()
-            return False
+                return False
+
+            # Содержимое файла уже объединено с URL_PATTERNS, если он не изменился
+            if mtime == cls._config_mtime:
+                return True
+
+            with open(cls.CONFIG_FILE, 'rb') as f:
+                patterns = json.loads(f.read())
+            with cls._init_lock:
+                cls._config_mtime = mtime
+                changed_services = set()
+                # Обновляем только существующие сервисы, новые не добавляем
+                for service, service_patterns in patterns.items():
+                    if service in cls.URL_PATTERNS:
+                        # Добавляем только новые паттерны; dict.fromkeys убирает повторы внутри файла
+                        existing_patterns = set(cls.URL_PATTERNS[service])
+                        new_patterns = [
+                            pattern for pattern in dict.fromkeys(service_patterns)
+                            if pattern not in existing_patterns and cls._is_usable_pattern(service, pattern)
+                        ]
+                        if new_patterns:
+                            cls.URL_PATTERNS[service].extend(new_patterns)
+                            changed_services.add(service)
+                # Повторная загрузка после инициализации должна пересобрать выражения
+                if changed_services:
+                    cls._rebuild_patterns(changed_services)
+            logger.info("Паттерны URL успешно загружены из конфигурации")
+            return True
         except Exception as e:
             logger.error(f"Ошибка загрузки паттернов URL из конфигурации: {e}")
             return False
@@ -291,8 +437,14 @@ class VideoURL:
         Возвращает True в случае успешного сохранения, иначе False.
         """
         try:
-            with open(cls.CONFIG_FILE, 'w', encoding='utf-8') as f:
+            # Пишем во временный файл и атомарно подменяем конфигурацию, чтобы
+            # прерванная запись не оставила поврежденный JSON
+            tmp_filename = cls.CONFIG_FILE + '.tmp'
+            with open(tmp_filename, 'w', encoding='utf-8') as f:
                 json.dump(cls.URL_PATTERNS, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_filename, cls.CONFIG_FILE)
+            # Записанный файл совпадает с URL_PATTERNS, перечитывать его не нужно
+            cls._config_mtime = os.stat(cls.CONFIG_FILE).st_mtime_ns
             logger.info("Паттерны URL успешно сохранены в конфигурацию")
             return True
         except Exception as e:
@@ -309,8 +461,10 @@ class VideoURL:
             if service in cls.URL_PATTERNS:
                 if pattern not in cls.URL_PATTERNS[service]:
                     # Проверяем валидность регулярного выражения
-                    re.compile(pattern)
-                    cls.URL_PATTERNS[service].append(pattern)
+                    cls._validate_pattern(pattern)
+                    with cls._init_lock:
+                        cls.URL_PATTERNS[service].append(pattern)
+                        cls._rebuild_patterns({service})
                     logger.info(f"Добавлен новый паттерн для {service}: {pattern}")
                     cls.save_patterns_to_config()
                     return True
@@ -327,81 +481,106 @@ class VideoURL:
         """Определяет название видеосервиса по URL с оптимизацией."""
         if not url:
             return 'Неизвестный сервис'
+        # Кэшируется только определение сервиса; запись в лог выполняется при каждом вызове
+        service, unknown_format = cls._lookup_service(url)
+        if unknown_format:
+            cls.log_unknown_url_format(service, url)
+        return service
 
-        # Проверяем кэш сначала
-        cached_service = cls._service_cache.get(url)
-        if cached_service:
-            return cached_service
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def _lookup_service(cls, url: str) -> Tuple[str, bool]:
+        """
+        Определяет сервис по домену и паттернам URL.
 
-        # Инициализируем структуры данных при первом запросе
-        if not cls._patterns_loaded:
-            cls.load_patterns_from_config()
-            cls._init_combined_patterns()
-            cls._init_domain_trie()
-            cls._patterns_loaded = True
+        Результат кэшируется до изменения паттернов (см. _rebuild_patterns).
+
+        Returns:
+            Кортеж (название сервиса, True если домен известен, а формат URL - нет)
+        """
+        domain_service, matched_service = cls._classify_url(url)
+        if domain_service != 'Неизвестный сервис':
+            # Если паттерн не совпал, но домен известен
+            unknown_format = matched_service != domain_service and cls._canonical_url(url)[1]
+            return domain_service, unknown_format
+        return matched_service or domain_service, False
 
-        service = 'Неизвестный сервис'
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def _classify_url(cls, url: str) -> Tuple[str, Optional[str]]:
+        """
+        Определяет сервис по домену и сервис, паттерну которого соответствует URL.
 
-        # Сначала быстрая проверка по trie-структуре доменов
-        trie_service = cls._domain_trie.find_service(url)
-        if trie_service != 'Неизвестный сервис':
-            # Проверяем точное соответствие паттернам для найденного сервиса
-            if trie_service in cls._compiled_patterns:
-                compiled_pattern = cls._compiled_patterns[trie_service]
-                try:
-                    if isinstance(compiled_pattern, re.Pattern):
-                        if compiled_pattern.match(url):
-                            service = trie_service
-                    else:
-                        # Если используются отдельные скомпилированные паттерны
-                        for _, pattern_re in compiled_pattern:
-                            if pattern_re.match(url):
-                                service = trie_service
-                                break
-                except Exception as e:
-                    logger.warning(f"Ошибка при проверке URL для {trie_service}: {e}")
+        is_valid и get_service_name вызываются для одного и того же URL подряд,
+        поэтому разбор домена и проверка паттернов выполняются один раз на оба.
+        Результат кэшируется до изменения паттернов (см. _rebuild_patterns).
 
-            # Если паттерн не совпал, но домен известен
-            if service == 'Неизвестный сервис':
-                cls.log_unknown_url_format(trie_service, url)
-                service = trie_service
-        else:
-            # Если домен не найден в trie, проверяем все паттерны
-            for service_name, compiled_pattern in cls._compiled_patterns.items():
-                try:
-                    if isinstance(compiled_pattern, re.Pattern):
-                        if compiled_pattern.match(url):
-                            service = service_name
-                            break
-                    else:
-                        # Если используются отдельные скомпилированные паттерны
-                        for _, pattern_re in compiled_pattern:
-                            if pattern_re.match(url):
-                                service = service_name
-                                break
-                        if service != 'Неизвестный сервис':
-                            break
-                except Exception as e:
-                    logger.warning(f"Ошибка при проверке URL для {service_name}: {e}")
-
-        # Кэшируем результат
-        cls._service_cache.set(url, service)
+        Returns:
+            Кортеж (сервис по домену, сервис по паттерну или None)
+        """
+        # Инициализируем структуры данных при первом запросе
+        cls._ensure_initialized()
 
-        return service
+        # Домен сервиса определяется без учета регистра, порта и данных пользователя,
+        # поэтому и паттерны сопоставляются с URL, приведенным к тому же виду
+        domain_service = cls._find_service_by_domain(url)
+        url = cls._canonical_url(url)[0]
+
+        # Если домен известен и для сервиса есть паттерны, проверяем только их;
+        # иначе проверяем общий паттерн всех сервисов за один проход
+        if domain_service in cls._compiled_patterns:
+            matched_service = domain_service if cls._matches_service(domain_service, url) else None
+        else:
+            matched_service = cls._match_service(url)
+        return domain_service, matched_service
 
     @classmethod
     def log_unknown_url_format(cls, service: str, url: str) -> None:
         """
         Логирует неизвестный формат URL для возможного обновления паттернов.
+
+        Записи накапливаются в памяти и дописываются в файл пачкой при
+        переполнении буфера, по запросу и при завершении программы.
+        Один и тот же URL записывается только один раз.
         """
         try:
-            log_file = f"unknown_{service.lower()}_urls.log"
-            with open(log_file, 'a', encoding='utf-8') as f:
-                f.write(f"{datetime.now()} - {url}\n")
+            with cls._unknown_log_lock:
+                if url in cls._unknown_seen:
+                    return
+                cls._unknown_seen.add(url)
+                cls._unknown_seen_order.append(url)
+                if len(cls._unknown_seen_order) > cls.UNKNOWN_LOG_SEEN_LIMIT:
+                    cls._unknown_seen.discard(cls._unknown_seen_order.popleft())
+                cls._unknown_log_buffer[service].append(f"{datetime.now()} - {url}\n")
+                cls._unknown_log_pending += 1
+                flush_needed = cls._unknown_log_pending >= cls.UNKNOWN_LOG_FLUSH_THRESHOLD
             logger.warning(f"Обнаружен нераспознанный формат URL для {service}: {url}")
+            if flush_needed:
+                cls.flush_unknown_url_logs()
         except Exception as e:
             logger.error(f"Ошибка при логировании неизвестного формата URL: {e}")
 
+    @classmethod
+    def flush_unknown_url_logs(cls) -> None:
+        """
+        Дописывает накопленные записи о нераспознанных URL в файлы логов.
+        Каждый файл открывается один раз на весь накопленный буфер.
+        """
+        with cls._unknown_log_lock:
+            buffer = cls._unknown_log_buffer
+            if not buffer:
+                return
+            cls._unknown_log_buffer = defaultdict(list)
+            cls._unknown_log_pending = 0
+
+        for service, lines in buffer.items():
+            try:
+                log_file = f"unknown_{service.lower()}_urls.log"
+                with open(log_file, 'a', encoding='utf-8') as f:
+                    f.writelines(lines)
+            except Exception as e:
+                logger.error(f"Ошибка при записи лога неизвестных URL для {service}: {e}")
+
     @classmethod
     @performance_profiler.profile("VideoURL.is_valid")
     def is_valid(cls, url: str) -> Tuple[bool, str]:
@@ -409,54 +588,79 @@ class VideoURL:
         Проверяет валидность URL для поддерживаемых видеосервисов.
         Возвращает кортеж (валидность, сообщение об ошибке).
         """
+        # Поле ввода и очередь проверяют одни и те же URL многократно, поэтому
+        # кэшируется только сама проверка; запись в лог выполняется при каждом вызове
+        result, unknown_service, checked_url = cls._check_url(url)
+        if unknown_service is not None:
+            cls.log_unknown_url_format(unknown_service, checked_url)
+        return result
+
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def _check_url(cls, url: str) -> Tuple[Tuple[bool, str], Optional[str], str]:
+        """
+        Выполняет проверку URL для is_valid.
+
+        Результат кэшируется до изменения паттернов (см. _rebuild_patterns).
+
+        Returns:
+            Кортеж (результат для is_valid, сервис, формат URL которого нужно
+            записать в лог, или None, проверенный URL)
+        """
         try:
             if not url:
-                raise URLValidationError("URL не может быть пустым")
+                return _RESULT_EMPTY, None, url
 
             if not url.startswith(('http://', 'https://')):
-                # Пытаемся исправить URL автоматически
-                if '://' not in url:
-                    fixed_url = f"https://{url}"
-                    logger.info(f"Автоматическое исправление URL: {url} -> {fixed_url}")
-                    return cls.is_valid(fixed_url)
-                else:
-                    raise URLValidationError("URL должен начинаться с http:// или https://")
-
-            # Инициализируем объединенные паттерны при необходимости
-            if not cls._patterns_loaded:
-                cls.load_patterns_from_config()
-                cls._init_combined_patterns()
-                cls._patterns_loaded = True
-                
-            # Проверяем по объединенным паттернам для ускорения
-            for service, compiled_pattern in cls._compiled_patterns.items():
-                try:
-                    if isinstance(compiled_pattern, re.Pattern):
-                        if compiled_pattern.match(url):
-                            logger.info(f"URL валиден для сервиса {service}: {url}")
-                            return True, ""
-                    else:
-                        # Если используются отдельные скомпилированные паттерны
-                        for pattern, pattern_re in compiled_pattern:
-                            if pattern_re.match(url):
-                                logger.info(f"URL валиден для сервиса {service}: {url}")
-                                return True, ""
-                except Exception as e:
-                    logger.warning(f"Ошибка при проверке URL для {service}: {e}")
-
-            # Если URL содержит домен известного сервиса, но не соответствует паттерну
-            service = cls.get_service_name(url)
-            if service != 'Неизвестный сервис':
-                raise URLValidationError(
-                    f"Неверный формат URL для {service}. Проверьте правильность ссылки или сообщите разработчику о новом формате."
-                )
-
-            return False, "Неподдерживаемый видеосервис или неверный формат URL"
-        except URLValidationError as e:
-            return False, str(e)
+                if '://' in url:
+                    return _RESULT_BAD_SCHEME, None, url
+                # Исправляем URL автоматически и продолжаем проверку без повторного вызова
+                fixed_url = f"https://{url}"
+                logger.info("Автоматическое исправление URL: %s -> %s", url, fixed_url)
+                url = fixed_url
+
+            # Заведомо слишком длинные строки отбрасываем до разбора и регулярных выражений
+            if len(url) > cls.MAX_URL_LENGTH:
+                return _RESULT_TOO_LONG, None, url
+
+            domain_service, service = cls._classify_url(url)
+            if service is not None:
+                # Успешная проверка выполняется для каждого URL при пакетном добавлении,
+                # поэтому сообщение строится только при включенном уровне DEBUG
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("URL валиден для сервиса %s: %s", service, url)
+                return _RESULT_OK, None, url
+
+            # Если URL содержит домен известного сервиса, но не соответствует паттерну;
+            # сервис уже найден выше, повторно разбирать URL не нужно
+            # URL с нестандартным портом не считаем новым форматом ссылок сервиса
+            if domain_service != 'Неизвестный сервис':
+                unknown_service = domain_service if cls._canonical_url(url)[1] else None
+                return _bad_format_result(domain_service), unknown_service, url
+
+            return _RESULT_UNSUPPORTED, None, url
         except Exception as e:
             logger.exception(f"Неожиданная ошибка при проверке URL: {url}")
-            return False, f"Ошибка при проверке URL: {str(e)}"
+            return (False, f"Ошибка при проверке URL: {str(e)}"), None, url
+
+    @classmethod
+    def _individual_patterns(cls, service: str) -> List[Tuple[str, re.Pattern]]:
+        """
+        Возвращает паттерны сервиса, скомпилированные по отдельности.
+
+        Returns:
+            Список кортежей (паттерн, скомпилированное выражение)
+        """
+        individual = cls._individual_compiled.get(service)
+        if individual is None:
+            individual = []
+            for pattern in cls.URL_PATTERNS.get(service, []):
+                try:
+                    individual.append((pattern, re.compile(pattern)))
+                except re.error:
+                    continue
+            cls._individual_compiled[service] = individual
+        return individual
 
     @staticmethod
     def test_url(url: str) -> Dict[str, Any]:
@@ -485,22 +689,19 @@ class VideoURL:
             service = VideoURL.get_service_name(url)
             result["service"] = service
             
-            # Проверяем соответствие паттернам
-            for pattern in VideoURL.URL_PATTERNS.get(service, []):
-                try:
-                    if re.match(pattern, url):
-                        result["is_valid"] = True
-                        result["matched_pattern"] = pattern
-                        break
-                except re.error:
-                    continue
+            # Проверяем соответствие паттернам так же, как is_valid
+            canonical_url = VideoURL._canonical_url(url)[0]
+            for pattern, pattern_re in VideoURL._individual_patterns(service):
+                if pattern_re.match(canonical_url):
+                    result["is_valid"] = True
+                    result["matched_pattern"] = pattern
+                    break
             
             # Если не соответствует, пытаемся предложить паттерн
             if not result["is_valid"] and service != "Неизвестный сервис":
-                # Создаем упрощенный паттерн на основе URL
-                domain_part = url.split('//')[1].split('/')[0]
-                path_parts = url.split(domain_part)[1]
-                suggested_pattern = f"^https?://(?:www\\.)?{domain_part.replace('.', '\\.')}\\S*$"
+                # Создаем упрощенный паттерн на основе хоста URL
+                escaped_domain = VideoURL._host(url).replace('.', '\\.')
+                suggested_pattern = f"^https?://(?:www\\.)?{escaped_domain}\\S*$"
                 result["suggested_pattern"] = suggested_pattern
                 result["error_message"] = f"URL не соответствует известным паттернам для {service}"
             
@@ -512,8 +713,43 @@ class VideoURL:
             
         return result
 
-# Инициализируем паттерны при импорте
-VideoURL.load_patterns_from_config()
-VideoURL._init_combined_patterns()
-VideoURL._init_domain_trie()
-VideoURL._patterns_loaded = True
\ No newline at end of file
+
+class _DualPattern:
+    """
+    Выражение, скомпилированное движками RE2 и re.
+
+    В RE2 класс \\w включает только ASCII, а '$' не совпадает перед завершающим
+    переводом строки, поэтому такие URL сопоставляются стандартным движком,
+    чтобы результат не отличался от re.
+    """
+
+    __slots__ = ('_fast', '_full')
+
+    def __init__(self, fast, full: re.Pattern):
+        self._fast = fast
+        self._full = full
+
+    def match(self, text: str):
+        fast = text.isascii() and not text.endswith('\n')
+        return (self._fast if fast else self._full).match(text)
+
+
+def _compile_pattern(pattern: str):
+    """
+    Компилирует паттерн движком RE2, если он установлен, иначе модулем re.
+
+    Returns:
+        Объект с методом match(), совместимым с re.Pattern
+    """
+    compiled = re.compile(pattern)
+    if re2 is None:
+        return compiled
+    try:
+        return _DualPattern(re2.compile(pattern), compiled)
+    except Exception:
+        # RE2 не поддерживает часть конструкций re (например, обратные ссылки)
+        return compiled
+
+
+# Несброшенные записи о нераспознанных URL сохраняются при завершении программы
+atexit.register(VideoURL.flush_unknown_url_logs)